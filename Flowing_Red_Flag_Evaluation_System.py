@@ -1,2318 +1,2623 @@
-# 流动红旗评比系统 (Flowing Red Flag Evaluation System)
-# Copyright (C) 2025 流动红旗评比系统开发团队
-#
-# 本程序是自由软件：您可以根据自由软件基金会发布的GNU Affero通用公共许可证版本3
-# 或（您选择的）任何 later version 的条款重新分发和/或修改它。
-#
-# 本程序的分发是希望它能发挥作用，但不提供任何担保；甚至没有适销性或特定用途适用性的隐含保证。
-# 有关详细信息，请参阅GNU Affero通用公共许可证。
-#
-# 您应该已经收到了GNU Affero通用公共许可证的副本。如果没有，请参见<http://www.gnu.org/licenses/>。
-#
-# 本项目采用 Creative Commons Attribution-ShareAlike 3.0 Unported License (CC-BY-SA 3.0)
-# 您可以自由地共享和演绎本作品，但必须署名并以相同方式共享。
-#
-# 更多信息请查看项目根目录的 LICENSE 文件和 README.md 文件。
-
-import tkinter as tk
-from tkinter import ttk
-from tkinter import simpledialog
-import tkinter.messagebox as messagebox
-import tkinter.filedialog as filedialog
-import json
-import datetime
-import os
-
-# 导入模块化的管理器
-from settings_manager import SettingsManager, Config
-from log_manager import LogManager
-from history_manager import HistoryManager
-
-def setup_chinese_font_support():
-    try:
-        import tkinter.font as tkFont
-        root = tk.Tk()
-        available_fonts = list(tkFont.families())
-        root.destroy()
-        preferred_fonts = [
-            "Microsoft YaHei UI", "Microsoft YaHei", "SimHei", "KaiTi", 
-            "FangSong", "STHeiti", "STSong", "PingFang SC", "Hiragino Sans GB",
-            "Noto Sans CJK SC", "Source Han Sans CN", "Arial Unicode MS"
-        ]
-        for font in preferred_fonts:
-            if font in available_fonts:
-                return font
-        return "Arial Unicode MS" if "Arial Unicode MS" in available_fonts else None
-    except Exception as e:
-        print(f"字体设置出错: {e}")
-        return None
-
-chinese_font = setup_chinese_font_support()
-
-class FlowingRedFlagEvaluationSystem:
-    def __init__(self, root):
-        self.root = root
-        self.settings_manager = SettingsManager()
-        # 获取当前语言设置
-        self.current_language = self.settings_manager.get_language()
-        self.root.title('流动红旗评比系统' if self.current_language == 'zh' else 'Flowing Red Flag Evaluation System')
-        self.root.geometry("1600x900")
-        
-        # 设置窗口图标
-        try:
-            # 使用新生成的ICO格式图标
-            converted_icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'converted_icon.ico')
-            if os.path.exists(converted_icon_path):
-                self.root.iconbitmap(converted_icon_path)
-                print(f"成功设置窗口图标: {converted_icon_path}")
-            else:
-                # 回退到原始ICO格式
-                icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icon.ico')
-                self.root.iconbitmap(icon_path)
-                print(f"回退到原始窗口图标: {icon_path}")
-        except Exception as e:
-            print(f"设置窗口图标失败: {e}")
-        
-        self.log_manager = LogManager(self.settings_manager)
-        self.history_manager = HistoryManager()
-        
-        self.punishments = {}
-        self.items = Config.ITEMS
-        self.classes = self.settings_manager.get_classes()
-        self.weighted_addition = self.settings_manager.get_weighted_addition().copy()
-        self.dual_period_items = Config.DUAL_PERIOD_ITEMS
-        
-        # 初始化class_combobox为None
-        self.class_combobox = None
-        
-        self.create_main_layout()
-        self.create_menu()
-        self.create_notebook()
-        self.create_sidebar()
-        self.create_status_bar()
-        self.bind_shortcuts()
-        
-        self.punishment_list_tree = None
-        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_change)
-        self.root.bind("<Button-1>", self.on_click_anywhere)
-        
-        self.save_snapshot()
-        self.log_manager.log("系统启动")
-        
-        self.root.after(100, self.show_welcome_message)
-    
-    def show_welcome_message(self):
-        self.update_status("🟢 系统已启动，双击表格单元格可编辑数据")
-        
-        # 检查是否是首次运行（没有保存的数据文件）
-        if not self.has_data_file():
-            self.prompt_for_data_file()
-    
-    def has_data_file(self):
-        """检查是否存在数据文件"""
-        root_dir = self.settings_manager.get_root_directory()
-        # 检查目录下是否有JSON数据文件
-        if os.path.exists(root_dir) and os.path.isdir(root_dir):
-            for file in os.listdir(root_dir):
-                if file.endswith('.json') and file.startswith('流动红旗分数数据_'):
-                    return True
-        return False
-    
-    def prompt_for_data_file(self):
-        """提示用户选择数据文件"""
-        result = messagebox.askyesno("首次运行", "检测到这是首次运行系统，是否要加载现有的数据文件？\n\n选择'是'加载数据文件，选择'否'使用默认设置。")
-        if result:
-            self.load_data()
-    
-    def create_main_layout(self):
-        style = ttk.Style()
-        print("可用的主题:", style.theme_names())
-        
-        self.main_frame = ttk.Frame(self.root)
-        self.main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        self.title_frame = ttk.Frame(self.main_frame)
-        self.title_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        title_label = ttk.Label(self.title_frame, text='流动红旗评比系统', 
-                               font=("微软雅黑", 18, "bold"))
-        title_label.pack()
-        
-        # 添加分割线
-        separator = ttk.Separator(self.main_frame, orient='horizontal')
-        separator.pack(fill=tk.X, pady=(0, 10))
-        
-        self.content_frame = ttk.Frame(self.main_frame)
-        self.content_frame.pack(fill=tk.BOTH, expand=True)
-    
-    def create_menu(self):
-        menubar = tk.Menu(self.root)
-        self.root.config(menu=menubar)
-        
-        # 获取当前语言的菜单标签
-        lang = self.language_dict.get(self.current_language, self.language_dict['zh'])
-        
-        # 文件菜单 - 数据操作相关
-        file_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label=lang['file'], menu=file_menu)
-        file_menu.add_command(label=lang['save_data'], command=self.save_data, accelerator="Ctrl+S")
-        file_menu.add_command(label=lang['save_as'], command=self.save_as_data)
-        file_menu.add_command(label=lang['load_data'], command=self.load_data, accelerator="Ctrl+O")
-        file_menu.add_separator()
-        file_menu.add_command(label=lang['export_table'], command=self.save_total_score_table)
-        file_menu.add_separator()
-        file_menu.add_command(label=lang['exit'], command=self.root.quit)
-        
-        # 编辑菜单 - 数据编辑相关
-        edit_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label=lang['edit'], menu=edit_menu)
-        edit_menu.add_command(label=lang['undo'], command=self.undo_action, accelerator="Ctrl+Z")
-        edit_menu.add_command(label=lang['redo'], command=self.redo_action, accelerator="Ctrl+Y")
-        edit_menu.add_separator()
-        edit_menu.add_command(label=lang['reset_data'], command=self.reset_program)
-        
-        # 视图菜单 - 界面视图相关
-        view_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label=lang['view'], menu=view_menu)
-        view_menu.add_command(label=lang['toggle_fullscreen'], command=self.toggle_fullscreen, accelerator="F11")
-        
-        # 数据菜单 - 数据管理相关
-        data_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label=lang['data'], menu=data_menu)
-        data_menu.add_command(label=lang['manage_punishments'], command=self.manage_punishments)
-        data_menu.add_command(label=lang['history'], command=self.show_history)
-        
-        # 设置菜单 - 系统设置相关
-        settings_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label=lang['settings'], menu=settings_menu)
-        settings_menu.add_command(label=lang['system_settings'], command=self.open_settings)
-        
-        # 工具菜单 - 计算和输出相关
-        tools_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label=lang['tools'], menu=tools_menu)
-        tools_menu.add_command(label=lang['calculate_total'], command=self.calculate_totals)
-        tools_menu.add_command(label=lang['output_table'], command=self.calculate_and_output_table)
-        tools_menu.add_command(label=lang['evaluation_result'], command=self.show_evaluation_result)
-        tools_menu.add_command(label=lang['export_table_alt'], command=self.save_total_score_table)
-        
-        # 帮助菜单
-        help_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label=lang['help'], menu=help_menu)
-        help_menu.add_command(label=lang['about'], command=self.show_about)
-    
-    def create_notebook(self):
-        self.left_frame = ttk.Frame(self.content_frame)
-        self.left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
-        
-        self.notebook = ttk.Notebook(self.left_frame)
-        self.notebook.pack(fill=tk.BOTH, expand=True)
-        
-        self.pages = {}
-        for name in self.items:
-            self.pages[name] = self.create_page(name)
-        
-        for name, page in self.pages.items():
-            self.notebook.add(page, text=name)
-    
-    def create_page(self, page_name):
-        frame = ttk.Frame(self.notebook)
-        frame.pack(fill=tk.BOTH, expand=True)
-        
-        item_info = self.items[page_name]
-        columns = item_info["columns"]
-        max_score = self.settings_manager.get_max_score(page_name)
-        
-        if page_name in self.dual_period_items:
-            am_frame = ttk.LabelFrame(frame, text=f"上午{page_name}")
-            am_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-            am_tree = self.create_tree(am_frame, columns)
-            am_tree.pack(fill=tk.BOTH, expand=True)
-            
-            pm_frame = ttk.LabelFrame(frame, text=f"下午{page_name}")
-            pm_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-            pm_tree = self.create_tree(pm_frame, columns)
-            pm_tree.pack(fill=tk.BOTH, expand=True)
-            
-            frame.am_tree = am_tree
-            frame.pm_tree = pm_tree
-            
-            for cls in self.classes:
-                values = (cls, max_score, max_score, max_score, max_score, max_score, max_score)
-                am_tree.insert("", "end", values=values)
-                pm_tree.insert("", "end", values=values)
-        else:
-            tree = self.create_tree(frame, columns)
-            tree.pack(fill=tk.BOTH, expand=True)
-            
-            for cls in self.classes:
-                values = (cls, max_score, max_score, max_score, max_score, max_score, max_score)
-                tree.insert("", "end", values=values)
-        
-        return frame
-    
-    def create_tree(self, parent, columns):
-        tree = ttk.Treeview(parent, columns=columns, show="headings")
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=80, anchor="center")
-        
-        tree.bind("<Double-1>", lambda event, tree=tree: self.on_double_click(event, tree))
-        return tree
-    
-    def create_sidebar(self):
-        self.right_frame = ttk.Frame(self.content_frame)
-        self.right_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=(5, 0))
-        
-        self.total_frame = ttk.LabelFrame(self.right_frame, text="🏆 总分排名", padding=10)
-        self.total_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        
-        tree_container = ttk.Frame(self.total_frame)
-        tree_container.pack(fill=tk.BOTH, expand=True)
-        
-        self.total_tree = ttk.Treeview(tree_container, columns=("排名", "班级", "总分"), show="headings", height=12)
-        self.total_tree.heading("排名", text="排名")
-        self.total_tree.heading("班级", text="班级")
-        self.total_tree.heading("总分", text="总分")
-        self.total_tree.column("排名", width=40, anchor="center")
-        self.total_tree.column("班级", width=90, anchor="center")
-        self.total_tree.column("总分", width=70, anchor="center")
-        
-        tree_scrollbar = ttk.Scrollbar(tree_container, orient=tk.VERTICAL, command=self.total_tree.yview)
-        self.total_tree.configure(yscrollcommand=tree_scrollbar.set)
-        
-        self.total_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.total_tree.tag_configure("first_place", background="#FFD700", foreground="black")
-        self.total_tree.tag_configure("top_five", background="#87CEEB", foreground="black")
-        self.total_tree.tag_configure("normal", background="white", foreground="black")
-        
-        self.action_frame = ttk.LabelFrame(self.right_frame, text="🛠️ 操作面板", padding=10)
-        self.action_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        # 合并计算总分和刷新功能的按钮
-        calculate_refresh_buttons = [
-            ("📊 计算/刷新", self.calculate_totals),
-            ("📋 输出表格", self.calculate_and_output_table)
-        ]
-        self.create_button_row(self.action_frame, calculate_refresh_buttons)
-        
-        # 奖惩管理和复原数据按钮
-        management_buttons = [
-            ("⚖️ 奖惩管理", self.manage_punishments),
-            ("🔄 复原数据", self.reset_program)
-        ]
-        self.create_button_row(self.action_frame, management_buttons)
-        
-        # 评比结果和导出表格按钮
-        result_buttons = [
-            ("🏆 评比结果", self.show_evaluation_result),
-            ("💾 导出表格", self.save_total_score_table)
-        ]
-        self.create_button_row(self.action_frame, result_buttons)
-    
-    def create_button_row(self, parent, buttons):
-        frame = ttk.Frame(parent)
-        frame.pack(fill=tk.X, padx=5, pady=5)
-        
-        for text, command in buttons:
-            btn = ttk.Button(frame, text=text, command=command)
-            btn.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=3, pady=2)
-        return frame
-    
-    def create_status_bar(self):
-        self.status_frame = ttk.Frame(self.root, relief=tk.RAISED, borderwidth=1)
-        self.status_frame.pack(fill=tk.X, side=tk.BOTTOM, padx=5, pady=5)
-        
-        self.status_icon = ttk.Label(self.status_frame, text="🟢", anchor=tk.W, width=3, font=("微软雅黑", 10), background="#e8f4f8")
-        self.status_icon.pack(side=tk.LEFT, padx=(5, 10))
-        
-        self.status_bar = ttk.Label(self.status_frame, text="系统就绪", relief=tk.FLAT, anchor=tk.W, 
-                                   font=("微软雅黑", 9), foreground="blue", background="#e8f4f8")
-        self.status_bar.pack(fill=tk.X, side=tk.LEFT, expand=True, padx=(0, 10))
-        
-        self.tip_label = ttk.Label(self.status_frame, text="提示: 双击表格可编辑数据 | Ctrl+T: 输出表格 | Ctrl+P: 惩罚管理 | Ctrl+R: 复原数据", 
-                                  relief=tk.FLAT, anchor=tk.CENTER, foreground="gray", 
-                                  font=("微软雅黑", 8), background="#e8f4f8")
-        self.tip_label.pack(side=tk.LEFT, padx=(10, 10))
-        
-        self.time_label = ttk.Label(self.status_frame, text="", relief=tk.FLAT, anchor=tk.E, 
-                                   font=("微软雅黑", 9), foreground="darkgreen", background="#e8f4f8")
-        self.time_label.pack(fill=tk.X, side=tk.RIGHT, expand=True, padx=(10, 5))
-        self.update_time()
-    
-    def update_time(self):
-        if self.root.winfo_exists():
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.time_label.config(text=current_time)
-            self.time_after_id = self.root.after(1000, self.update_time)
-    
-    def on_double_click(self, event, tree):
-        region = tree.identify_region(event.x, event.y)
-        if region == "cell":
-            item = tree.identify_row(event.y)
-            column = tree.identify_column(event.x)
-            
-            # 不允许编辑第一列（班级名称）
-            if column == "#1":
-                return
-            
-            # 获取当前值
-            current_value = tree.item(item, "values")[int(column[1]) - 1]
-            
-            # 如果点击的是平均分列（第7列），添加确认提示
-            if column == "#7":  # 第7列是平均分列
-                if not messagebox.askyesno("确认更改", "你确认要进行更改吗？这是平均分"):
-                    return
-            
-            bbox = tree.bbox(item, column)
-            if not bbox:
-                return
-            
-            x, y, width, height = bbox
-            
-            entry = ttk.Entry(tree, justify='center', font=("微软雅黑", 9))
-            entry.place(x=x, y=y, width=width, height=height)
-            entry.insert(0, current_value)
-            entry.select_range(0, tk.END)
-            
-            entry.bind("<Return>", lambda e, item=item, column=column, tree=tree, entry=entry: 
-                       self.on_enter(e, item, column, tree, entry))
-            entry.bind("<Escape>", lambda e, entry=entry: self.on_escape(e, entry))
-            entry.bind("<FocusOut>", lambda e, item=item, column=column, tree=tree, entry=entry: 
-                       self.on_focus_out(e, item, column, tree, entry))
-            entry.focus_set()
-            
-            try:
-                values = list(tree.item(item, "values"))
-                self.update_status(f"正在编辑: {values[0]} 班级 {column} 项目")
-            except Exception as e:
-                self.update_status(f"编辑项目时出错: {str(e)}")
-    
-    def on_enter(self, event, item, column, tree, entry):
-        new_value = entry.get()
-        try:
-            page_name = self.notebook.tab(self.notebook.select(), "text")
-            
-            for widget in self.notebook.nametowidget(self.notebook.select()).winfo_children():
-                if hasattr(widget, 'am_tree') and widget.am_tree == tree:
-                    page_name = widget.cget('text').replace('上午', '')
-                    break
-                elif hasattr(widget, 'pm_tree') and widget.pm_tree == tree:
-                    page_name = widget.cget('text').replace('下午', '')
-                    break
-            
-            score = float(new_value)
-            max_score = self.settings_manager.get_max_score(page_name)
-            if score < 0 or score > max_score:
-                messagebox.showerror("输入错误", f"分数应在0-{max_score}之间！\n\n您输入的值: {new_value}")
-                self.update_status(f"输入错误: 分数应在0-{max_score}之间")
-                entry.destroy()
-                return
-        except ValueError:
-            messagebox.showerror("输入错误", f"请输入有效的数字！\n\n您输入的值: {new_value}")
-            self.update_status("输入错误: 请输入有效的数字")
-            entry.destroy()
-            return
-        
-        try:
-            values = list(tree.item(item, "values"))
-            col_index = int(column[1]) - 1
-            
-            values[col_index] = new_value
-            
-            # 如果编辑的是1-5列，自动计算平均分
-            if 1 <= col_index <= 5:
-                scores = list(map(float, values[1:6]))
-                avg_score = sum(scores) / 5
-                values[6] = round(avg_score, 2)
-            
-            tree.item(item, values=values)
-            
-            self.save_snapshot()
-            
-            entry.destroy()
-            self.update_status(f"已更新 {values[0]} 班级的分数")
-            self.log_manager.log(f"更新 {values[0]} 班级 {page_name} 项目分数为 {new_value}")
-            self.calculate_totals()
-        except Exception as e:
-            self.update_status(f"更新分数时出错: {str(e)}")
-            entry.destroy()
-    
-    def on_escape(self, event, entry):
-        entry.destroy()
-    
-    def on_focus_out(self, event, item, column, tree, entry):
-        # 当输入框失去焦点时，自动保存更改
-        self.on_enter(event, item, column, tree, entry)
-    
-    def update_status(self, message):
-        self.status_bar.config(text=message)
-        self.root.after(3000, lambda: self.status_bar.config(text="就绪"))
-    
-    def bind_shortcuts(self):
-        self.root.bind('<Control-s>', lambda e: self.save_data())
-        self.root.bind('<Control-o>', lambda e: self.load_data())
-        self.root.bind('<Control-t>', lambda e: self.calculate_and_output_table())
-        self.root.bind('<Control-p>', lambda e: self.manage_punishments())
-        self.root.bind('<Control-r>', lambda e: self.reset_program())
-        self.root.bind('<Control-e>', lambda e: self.save_total_score_table())
-        self.root.bind('<Control-z>', lambda e: self.undo_action())
-        self.root.bind('<Control-y>', lambda e: self.redo_action())
-        self.root.bind('<F5>', lambda e: self.calculate_totals())
-        self.root.bind('<F6>', lambda e: self.show_evaluation_result())
-        self.root.bind('<F11>', lambda e: self.toggle_fullscreen())
-    
-    def reset_program(self):
-        if messagebox.askyesno("确认", "确定要复原所有数据吗？"):
-            self.save_snapshot()
-            
-            self.reset_data()
-            self.punishments.clear()
-            self.update_status("数据已复原")
-            self.log_manager.log("执行数据复原操作")
-    
-    def reset_data(self):
-        self.classes = self.settings_manager.get_classes()
-        
-        for page_name, page_frame in self.pages.items():
-            if page_name in self.dual_period_items:
-                self.reset_tree_data(page_frame.am_tree, page_name)
-                self.reset_tree_data(page_frame.pm_tree, page_name)
-            else:
-                for widget in page_frame.winfo_children():
-                    if isinstance(widget, ttk.Treeview):
-                        self.reset_tree_data(widget, page_name)
-        
-        for item in self.total_tree.get_children():
-            self.total_tree.delete(item)
-        
-        self.punishments.clear()
-        # 检查punishment_list_tree组件是否仍然有效
-        if hasattr(self, 'punishment_list_tree') and self.punishment_list_tree is not None:
-            for item in self.punishment_list_tree.get_children():
-                self.punishment_list_tree.delete(item)
-    
-    def reset_tree_data(self, tree, page_name):
-        max_score = self.settings_manager.get_max_score(page_name)
-        if isinstance(tree, ttk.Treeview):
-            # 禁用界面刷新以提高性能
-            tree.config(selectmode='none')
-            
-            for item in tree.get_children():
-                values = list(tree.item(item, "values"))
-                for i in range(1, 6):
-                    values[i] = max_score
-                values[6] = max_score
-                tree.item(item, values=values)
-            
-            # 恢复界面刷新
-            tree.config(selectmode='browse')
-        else:
-            for widget in tree.winfo_children():
-                if isinstance(widget, ttk.Treeview):
-                    # 禁用界面刷新以提高性能
-                    widget.config(selectmode='none')
-                    
-                    for item in widget.get_children():
-                        values = list(widget.item(item, "values"))
-                        for i in range(1, 6):
-                            values[i] = max_score
-                        values[6] = max_score
-                        widget.item(item, values=values)
-                    
-                    # 恢复界面刷新
-                    widget.config(selectmode='browse')
-    
-    def calculate_totals(self):
-        # 批量更新优化：先禁用界面刷新，处理完所有数据后再启用
-        self.total_tree.config(selectmode='none')  # 禁用选择模式以减少刷新
-        
-        # 清空现有数据
-        for item in self.total_tree.get_children():
-            self.total_tree.delete(item)
-        
-        # 使用字典存储班级分数，提高查找效率
-        class_scores = {}
-        
-        # 预先获取所有页面数据，减少重复遍历
-        page_data_cache = {}
-        for page_name, page_frame in self.pages.items():
-            if page_name in self.dual_period_items:
-                page_data_cache[(page_name, 'am')] = self.get_cached_tree_data(page_frame.am_tree)
-                page_data_cache[(page_name, 'pm')] = self.get_cached_tree_data(page_frame.pm_tree)
-            else:
-                page_data_cache[page_name] = self.get_cached_tree_data(page_frame)
-        
-        for cls in self.classes:
-            total_score = 0
-            for page_name, page_frame in self.pages.items():
-                if page_name in self.dual_period_items:
-                    # 使用缓存数据提高效率
-                    am_data = page_data_cache.get((page_name, 'am'), {})
-                    pm_data = page_data_cache.get((page_name, 'pm'), {})
-                    am_avg = float(am_data.get(cls, 0)) if cls in am_data else 0
-                    pm_avg = float(pm_data.get(cls, 0)) if cls in pm_data else 0
-                    total_score += ((am_avg + pm_avg) / 2)
-                else:
-                    # 使用缓存数据提高效率
-                    page_data = page_data_cache.get(page_name, {})
-                    avg_score = float(page_data.get(cls, 0)) if cls in page_data else 0
-                    total_score += avg_score
-            
-            # 加权分数
-            total_score += self.weighted_addition.get(cls, 0)
-            
-            # 奖惩分数
-            if cls in self.punishments:
-                for punishment in self.punishments[cls]:
-                    if punishment["type"] == "add":
-                        total_score += punishment["score"]
-                    elif punishment["type"] == "subtract":
-                        total_score -= punishment["score"]
-            
-            class_scores[cls] = round(total_score, 2)
-        
-        # 排序班级分数
-        sorted_classes = sorted(class_scores.items(), key=lambda x: x[1], reverse=True)
-        
-        # 批量插入数据
-        for i, (cls, score) in enumerate(sorted_classes):
-            rank = i + 1
-            if i == 0:
-                self.total_tree.insert("", "end", values=(rank, cls, score), tags=("first_place",))
-            elif i < 5:
-                self.total_tree.insert("", "end", values=(rank, cls, score), tags=("top_five",))
-            else:
-                self.total_tree.insert("", "end", values=(rank, cls, score))
-        
-        # 恢复界面刷新
-        self.total_tree.config(selectmode='browse')
-        
-        self.log_manager.log("执行总分计算")
-    
-    def get_cached_tree_data(self, tree):
-        """缓存Treeview数据以提高访问效率"""
-        cache = {}
-        if isinstance(tree, ttk.Treeview):
-            for item in tree.get_children():
-                values = tree.item(item, "values")
-                if len(values) > 0:
-                    cache[values[0]] = values[6] if len(values) > 6 else 0
-        else:
-            for widget in tree.winfo_children():
-                if isinstance(widget, ttk.Treeview):
-                    for item in widget.get_children():
-                        values = widget.item(item, "values")
-                        if len(values) > 0:
-                            cache[values[0]] = values[6] if len(values) > 6 else 0
-        return cache
-    
-    def get_class_average(self, tree, cls):
-        if isinstance(tree, ttk.Treeview):
-            for item in tree.get_children():
-                values = tree.item(item, "values")
-                if values[0] == cls:
-                    return float(values[6])
-        else:
-            for widget in tree.winfo_children():
-                if isinstance(widget, ttk.Treeview):
-                    for item in widget.get_children():
-                        values = widget.item(item, "values")
-                        if values[0] == cls:
-                            return float(values[6])
-        return 0.0
-    
-    def calculate_and_output_table(self):
-        self.calculate_totals()
-        self.show_output_table()
-    
-    def show_output_table(self):
-        output_window = tk.Toplevel(self.root)
-        output_window.title("流动红旗评比总分表")
-        output_window.geometry("1200x600")
-        output_window.transient(self.root)
-        
-        columns = ("班级", "早迟到", "早读", "节能开窗", "仪容仪表", "间操", "午休", "上下午各班卫生", "巡视", "及时上交文件", "宿舍", "加权", "奖惩分", "奖惩备注", "总分")
-        tree = ttk.Treeview(output_window, columns=columns, show="headings")
-        
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=80)
-        
-        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # 禁用界面刷新以提高性能
-        tree.config(selectmode='none')
-        
-        # 预先获取所有数据以减少重复计算
-        all_scores = self.get_all_scores()
-        
-        for cls in self.classes:
-            values = [cls]
-            for page_name in self.items:
-                max_score = self.settings_manager.get_max_score(page_name)
-                
-                if page_name in self.dual_period_items:
-                    # 使用缓存的数据而不是重新计算
-                    am_avg = float(all_scores.get((page_name, cls, 'am'), 0))
-                    pm_avg = float(all_scores.get((page_name, cls, 'pm'), 0))
-                    avg_score = (am_avg + pm_avg) / 2
-                    values.append(round(avg_score, 2))
-                else:
-                    # 使用缓存的数据而不是重新计算
-                    avg_score = float(all_scores.get((page_name, cls), 0))
-                    values.append(avg_score)
-            values.append(self.weighted_addition.get(cls, 0))
-            punishment_score = 0
-            punishment_notes = []
-            if cls in self.punishments:
-                for punishment in self.punishments[cls]:
-                    if punishment["type"] == "add":
-                        punishment_score += punishment["score"]
-                    elif punishment["type"] == "subtract":
-                        punishment_score -= punishment["score"]
-                    punishment_notes.append(punishment["note"])
-            values.append(punishment_score)
-            values.append("\n".join(punishment_notes))
-            total_score = sum(map(float, values[1:-2])) + values[-2]
-            values.append(round(total_score, 2))
-            
-            tree.insert("", "end", values=values)
-        
-        # 恢复界面刷新
-        tree.config(selectmode='browse')
-        
-        v_scrollbar = ttk.Scrollbar(output_window, orient=tk.VERTICAL, command=tree.yview)
-        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        tree.configure(yscrollcommand=v_scrollbar.set)
-        
-        h_scrollbar = ttk.Scrollbar(output_window, orient=tk.HORIZONTAL, command=tree.xview)
-        h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
-        tree.configure(xscrollcommand=h_scrollbar.set)
-    
-    def show_evaluation_result(self):
-        self.calculate_totals()
-        
-        class_scores = {}
-        for item in self.total_tree.get_children():
-            values = self.total_tree.item(item, "values")
-            class_scores[values[1]] = float(values[2])
-        
-        sorted_classes = sorted(class_scores.items(), key=lambda x: x[1], reverse=True)
-        
-        result_window = tk.Toplevel(self.root)
-        result_window.title("流动红旗评比结果")
-        result_window.geometry("600x400")
-        result_window.transient(self.root)
-        
-        main_frame = ttk.Frame(result_window)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-        
-        title_label = ttk.Label(main_frame, text="流动红旗评比结果", font=("微软雅黑", 16, "bold"))
-        title_label.pack(pady=(0, 20))
-        
-        result_frame = ttk.Frame(main_frame)
-        result_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # 创建按钮框架
-        button_frame = ttk.Frame(result_frame)
-        button_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        # 添加显示图表按钮
-        show_chart_button = ttk.Button(button_frame, text="显示统计图表", command=lambda: self.show_evaluation_chart(class_scores))
-        show_chart_button.pack(side=tk.RIGHT)
-        
-        ttk.Label(result_frame, text="校级流动红旗获得者：", font=("微软雅黑", 12, "bold")).pack(anchor=tk.W, pady=(0, 10))
-        ttk.Label(result_frame, text=f"{sorted_classes[0][0]}（总分：{sorted_classes[0][1]}）", font=("微软雅黑", 12)).pack(anchor=tk.W)
-        
-        ttk.Label(result_frame, text="年级流动红旗获得者：", font=("微软雅黑", 12, "bold")).pack(anchor=tk.W, pady=(20, 10))
-        for i in range(1, min(5, len(sorted_classes))):
-            ttk.Label(result_frame, text=f"{sorted_classes[i][0]}（总分：{sorted_classes[i][1]}）", font=("微软雅黑", 12)).pack(anchor=tk.W)
-    
-    def manage_punishments(self):
-        # 使用局部变量而不是实例变量来避免组件引用问题
-        local_vars = {}
-        
-        punishment_window = tk.Toplevel(self.root)
-        punishment_window.title("奖惩管理")
-        punishment_window.geometry("800x500")
-        punishment_window.transient(self.root)
-        punishment_window.grab_set()
-        
-        main_frame = ttk.Frame(punishment_window)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-        
-        input_frame = ttk.LabelFrame(main_frame, text="添加奖惩")
-        input_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        input_frame.grid_columnconfigure(1, weight=1)
-        
-        ttk.Label(input_frame, text="选择班级:").grid(row=0, column=0, padx=10, pady=10, sticky="e")
-        # 使用局部变量存储组件引用
-        local_vars['class_combobox'] = ttk.Combobox(input_frame, values=self.classes)
-        local_vars['class_combobox'].grid(row=0, column=1, padx=10, pady=10, sticky="ew")
-        
-        ttk.Label(input_frame, text="奖惩类型:").grid(row=1, column=0, padx=10, pady=10, sticky="e")
-        local_vars['punishment_type'] = tk.StringVar()
-        type_frame = ttk.Frame(input_frame)
-        type_frame.grid(row=1, column=1, padx=10, pady=10, sticky="w")
-        ttk.Radiobutton(type_frame, text="奖励（加分）", variable=local_vars['punishment_type'], value="add").pack(side=tk.LEFT, padx=5)
-        ttk.Radiobutton(type_frame, text="惩罚（减分）", variable=local_vars['punishment_type'], value="subtract").pack(side=tk.LEFT, padx=5)
-        
-        ttk.Label(input_frame, text="分值:").grid(row=2, column=0, padx=10, pady=10, sticky="e")
-        local_vars['score_entry'] = ttk.Entry(input_frame)
-        local_vars['score_entry'].grid(row=2, column=1, padx=10, pady=10, sticky="ew")
-        
-        ttk.Label(input_frame, text="备注:").grid(row=3, column=0, padx=10, pady=10, sticky="e")
-        local_vars['note_entry'] = ttk.Entry(input_frame)
-        local_vars['note_entry'].grid(row=3, column=1, padx=10, pady=10, sticky="ew")
-        
-        button_frame = ttk.Frame(input_frame)
-        button_frame.grid(row=4, column=0, columnspan=2, pady=10)
-        
-        # 定义局部的添加和删除方法
-        def add_punishment_local():
-            cls = local_vars['class_combobox'].get()
-            if not cls:
-                messagebox.showerror("错误", "请选择班级！")
-                return
-            ptype = local_vars['punishment_type'].get()
-            if not ptype:
-                messagebox.showerror("错误", "请选择奖惩类型！")
-                return
-            score = local_vars['score_entry'].get()
-            try:
-                score = float(score)
-            except ValueError:
-                messagebox.showerror("错误", "请输入有效的分值！")
-                return
-            note = local_vars['note_entry'].get()
-            if not note:
-                messagebox.showerror("错误", "请输入备注！")
-                return
-            
-            if cls not in self.punishments:
-                self.punishments[cls] = []
-            self.punishments[cls].append({"type": ptype, "score": score, "note": note})
-            
-            type_text = "奖励" if ptype == "add" else "惩罚"
-            local_vars['punishment_list_tree'].insert("", "end", values=(cls, type_text, score, note))
-            
-            self.save_snapshot()
-            
-            local_vars['score_entry'].delete(0, tk.END)
-            local_vars['note_entry'].delete(0, tk.END)
-            self.update_status(f"已为 {cls} 添加奖惩")
-            self.log_manager.log(f"为 {cls} 添加{ptype}分 {score}，备注: {note}")
-        
-        def delete_punishment_local():
-            selected_item = local_vars['punishment_list_tree'].selection()
-            if not selected_item:
-                messagebox.showerror("错误", "请选择要删除的奖惩！")
-                return
-            
-            self.save_snapshot()
-            item = selected_item[0]
-            values = local_vars['punishment_list_tree'].item(item, "values")
-            cls = values[0]
-            ptype = values[1]
-            score = float(values[2])
-            note = values[3]
-            
-            if cls in self.punishments:
-                for i, punishment in enumerate(self.punishments[cls]):
-                    if punishment["type"] == ptype and punishment["score"] == score and punishment["note"] == note:
-                        self.punishments[cls].pop(i)
-                        local_vars['punishment_list_tree'].delete(item)
-                        
-                        self.save_snapshot()
-                        
-                        self.update_status(f"已删除 {cls} 的奖惩记录")
-                        self.log_manager.log(f"删除 {cls} 的奖惩记录: {ptype}分 {score}，备注: {note}")
-                        break
-        
-        add_button = ttk.Button(button_frame, text="添加奖惩", command=add_punishment_local)
-        add_button.pack(side=tk.LEFT, padx=5)
-        delete_button = ttk.Button(button_frame, text="删除奖惩", command=delete_punishment_local)
-        delete_button.pack(side=tk.LEFT, padx=5)
-        
-        list_frame = ttk.LabelFrame(main_frame, text="当前奖惩列表")
-        list_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # 创建Treeview和滚动条
-        tree_frame = ttk.Frame(list_frame)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        columns = ("班级", "类型", "分值", "备注")
-        local_vars['punishment_list_tree'] = ttk.Treeview(tree_frame, columns=columns, show="headings")
-        for col in columns:
-            local_vars['punishment_list_tree'].heading(col, text=col)
-            local_vars['punishment_list_tree'].column(col, width=150)
-        
-        # 正确配置滚动条
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=local_vars['punishment_list_tree'].yview)
-        local_vars['punishment_list_tree'].configure(yscrollcommand=scrollbar.set)
-        
-        # 使用grid布局确保滚动条正确显示
-        local_vars['punishment_list_tree'].grid(row=0, column=0, sticky='nsew')
-        scrollbar.grid(row=0, column=1, sticky='ns')
-        
-        # 配置grid权重
-        tree_frame.grid_rowconfigure(0, weight=1)
-        tree_frame.grid_columnconfigure(0, weight=1)
-        
-        for cls, punishments in self.punishments.items():
-            for punishment in punishments:
-                type_text = "奖励" if punishment["type"] == "add" else "惩罚"
-                local_vars['punishment_list_tree'].insert("", "end", values=(cls, type_text, punishment["score"], punishment["note"]))
-        
-        # 窗口关闭时不需要清理引用，因为使用的是局部变量
-        def on_closing():
-            punishment_window.destroy()
-        
-        punishment_window.protocol("WM_DELETE_WINDOW", on_closing)
-
-
-    
-
-    
-    def open_settings(self):
-        settings_window = tk.Toplevel(self.root)
-        settings_window.title("系统设置")
-        settings_window.geometry("400x300")
-        settings_window.transient(self.root)
-        
-        main_frame = ttk.Frame(settings_window)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-        
-        ttk.Button(main_frame, text="根目录设置", command=self.open_directory_settings, width=20).pack(pady=10)
-        ttk.Button(main_frame, text="文件路径信息", command=self.open_file_info, width=20).pack(pady=10)
-        ttk.Button(main_frame, text="项目分数设置", command=self.open_score_settings, width=20).pack(pady=10)
-        ttk.Button(main_frame, text="班级管理", command=self.open_class_settings, width=20).pack(pady=10)
-        
-        ttk.Button(main_frame, text="关于", command=self.show_about, width=20).pack(pady=10)
-    
-    def show_evaluation_chart(self, class_scores):
-        """显示评比结果的统计图表"""
-        try:
-            import matplotlib.pyplot as plt
-            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-            
-            # 创建新窗口
-            chart_window = tk.Toplevel(self.root)
-            chart_window.title("评比结果统计图表")
-            chart_window.geometry("800x600")
-            chart_window.transient(self.root)
-            
-            # 创建图表
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # 准备数据
-            classes = list(class_scores.keys())
-            scores = list(class_scores.values())
-            
-            # 创建柱状图
-            bars = ax.bar(classes, scores, color='skyblue')
-            
-            # 设置图表标题和标签
-            ax.set_title('流动红旗评比结果', fontsize=16, fontweight='bold')
-            ax.set_xlabel('班级', fontsize=12)
-            ax.set_ylabel('总分', fontsize=12)
-            
-            # 旋转x轴标签以避免重叠
-            plt.setp(ax.get_xticklabels(), rotation=45, ha="right", rotation_mode="anchor")
-            
-            # 在每个柱子上显示数值
-            for bar in bars:
-                height = bar.get_height()
-                ax.annotate(f'{height:.2f}',
-                            xy=(bar.get_x() + bar.get_width() / 2, height),
-                            xytext=(0, 3),  # 3 points vertical offset
-                            textcoords="offset points",
-                            ha='center', va='bottom')
-            
-            # 调整布局
-            plt.tight_layout()
-            
-            # 将图表嵌入到Tkinter窗口中
-            canvas = FigureCanvasTkAgg(fig, master=chart_window)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            
-        except ImportError:
-            messagebox.showerror("错误", "未安装matplotlib库，无法显示图表\n请运行: pip install matplotlib")
-        except Exception as e:
-            messagebox.showerror("错误", f"显示图表时出错：{str(e)}")
-
-    def open_directory_settings(self):
-        dir_window = tk.Toplevel(self.root)
-        dir_window.title("根目录设置")
-        dir_window.geometry("500x200")
-        dir_window.transient(self.root)
-        
-        main_frame = ttk.Frame(dir_window)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-        
-        ttk.Label(main_frame, text="当前根目录:").pack(anchor=tk.W)
-        current_dir_label = ttk.Label(main_frame, text=self.settings_manager.get_root_directory(), 
-                                     wraplength=400, justify=tk.LEFT)
-        current_dir_label.pack(fill=tk.X, pady=(5, 10))
-        
-        def choose_directory():
-            directory = filedialog.askdirectory(initialdir=self.settings_manager.get_root_directory())
-            if directory:
-                self.settings_manager.set_root_directory(directory)
-                current_dir_label.config(text=directory)
-                self.log_manager.log(f"更改根目录为: {directory}")
-                messagebox.showinfo("设置", "根目录已更新")
-        
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(fill=tk.X, pady=10)
-        
-        ttk.Button(button_frame, text="选择根目录", command=choose_directory).pack(side=tk.LEFT)
-
-    def open_file_info(self):
-        info_window = tk.Toplevel(self.root)
-        info_window.title("文件路径信息")
-        info_window.geometry("500x150")
-        info_window.transient(self.root)
-        
-        main_frame = ttk.Frame(info_window)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-        
-        ttk.Label(main_frame, text="数据文件路径:").pack(anchor=tk.W)
-        data_file_label = ttk.Label(main_frame, text=self.settings_manager.get_data_file_path(), 
-                                   wraplength=400, justify=tk.LEFT, foreground="blue")
-        data_file_label.pack(fill=tk.X, pady=(0, 10))
-        
-        ttk.Label(main_frame, text="日志文件路径:").pack(anchor=tk.W)
-        log_file_label = ttk.Label(main_frame, text=self.settings_manager.get_log_file_path(), 
-                                  wraplength=400, justify=tk.LEFT, foreground="blue")
-        log_file_label.pack(fill=tk.X)
-
-    def open_score_settings(self):
-        scores_window = tk.Toplevel(self.root)
-        scores_window.title("项目分数设置")
-        scores_window.geometry("600x500")
-        scores_window.transient(self.root)
-        
-        main_frame = ttk.Frame(scores_window)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-        
-        canvas = tk.Canvas(main_frame)
-        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(
-                scrollregion=canvas.bbox("all")
-            )
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        self.score_entries = {}
-        for item_name in self.items:
-            item_frame = ttk.Frame(scrollable_frame)
-            item_frame.pack(fill=tk.X, padx=5, pady=2)
-            
-            ttk.Label(item_frame, text=item_name, width=15).pack(side=tk.LEFT)
-            
-            max_score = self.settings_manager.get_max_score(item_name)
-            score_var = tk.StringVar(value=str(max_score))
-            self.score_entries[item_name] = score_var
-            
-            score_entry = ttk.Entry(item_frame, textvariable=score_var, width=10)
-            score_entry.pack(side=tk.LEFT, padx=5)
-        
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        save_frame = ttk.Frame(scores_window)
-        save_frame.pack(fill=tk.X, padx=20, pady=(0, 20))
-        
-        def save_scores():
-            try:
-                for item_name, var in self.score_entries.items():
-                    score = float(var.get())
-                    self.settings_manager.set_max_score(item_name, score)
-                
-                self.reset_data()
-                self.load_data()
-                self.update_status("项目分数设置已保存并应用")
-                self.log_manager.log("项目分数设置已更新")
-                messagebox.showinfo("设置", "项目分数设置已保存并应用")
-            except ValueError:
-                messagebox.showerror("错误", "请输入有效的数字！")
-        
-        ttk.Button(save_frame, text="保存分数设置", command=save_scores).pack(side=tk.LEFT)
-
-    def open_class_settings(self):
-        class_window = tk.Toplevel(self.root)
-        class_window.title("班级管理")
-        class_window.geometry("800x400")
-        class_window.transient(self.root)
-        
-        main_frame = ttk.Frame(class_window)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-        
-        self.create_class_management_section(main_frame)
-
-    def create_class_management_section(self, parent):
-        # 创建表格来显示班级信息
-        columns = ("班级名称", "加权分数")
-        self.class_tree = ttk.Treeview(parent, columns=columns, show="headings", height=10)
-        
-        # 设置表头
-        for col in columns:
-            self.class_tree.heading(col, text=col)
-            self.class_tree.column(col, width=150)
-        
-        # 添加滚动条
-        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.class_tree.yview)
-        self.class_tree.configure(yscrollcommand=scrollbar.set)
-        
-        # 布局
-        self.class_tree.pack(side=tk.TOP, fill=tk.BOTH, expand=True, pady=(0, 10))
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=(0, 10))
-        
-        # 添加按钮框架
-        button_frame = ttk.Frame(parent)
-        button_frame.pack(fill=tk.X, pady=5)
-        
-        # 添加班级按钮
-        ttk.Button(button_frame, text="添加班级", command=self.add_class).pack(side=tk.LEFT, padx=5)
-        
-        # 删除班级按钮
-        ttk.Button(button_frame, text="删除选中班级", command=self.remove_class).pack(side=tk.LEFT, padx=5)
-        
-        # 上移班级按钮
-        ttk.Button(button_frame, text="上移", command=self.move_class_up).pack(side=tk.LEFT, padx=5)
-        
-        # 下移班级按钮
-        ttk.Button(button_frame, text="下移", command=self.move_class_down).pack(side=tk.LEFT, padx=5)
-        
-        # 保存设置按钮
-        ttk.Button(button_frame, text="保存班级设置", command=self.save_class_settings).pack(side=tk.LEFT, padx=5)
-        
-        # 加载班级配置按钮
-        ttk.Button(button_frame, text="加载班级配置", command=self.load_class_config_file).pack(side=tk.LEFT, padx=5)
-        
-        # 加载现有班级数据
-        self.load_class_data_to_tree()
-        
-        # 绑定选择事件
-        self.class_tree.bind("<<TreeviewSelect>>", self.on_class_select)
-        # 绑定双击事件用于编辑
-        self.class_tree.bind("<Double-1>", self.on_class_tree_double_click)
-        
-        # 保存选中的项目
-        self.selected_class_item = None
-    
-    def on_class_tree_double_click(self, event):
-        """处理表格双击事件，允许编辑单元格"""
-        # 获取点击的项目和列
-        item = self.class_tree.identify_row(event.y)
-        column = self.class_tree.identify_column(event.x)
-        
-        if item and column:
-            # 获取当前值
-            values = self.class_tree.item(item, "values")
-            col_index = int(column[1:]) - 1  # 转换为0基索引
-            current_value = values[col_index]
-            
-            # 创建编辑窗口
-            self.create_edit_window(item, col_index, current_value)
-    
-    def create_edit_window(self, item, col_index, current_value):
-        """创建编辑窗口"""
-        # 创建顶层窗口
-        edit_window = tk.Toplevel(self.class_tree)
-        edit_window.title("编辑")
-        edit_window.geometry("300x100")
-        edit_window.transient(self.class_tree)
-        edit_window.grab_set()
-        
-        # 居中显示
-        edit_window.geometry("+{}+{}".format(
-            edit_window.winfo_screenwidth() // 2 - 150,
-            edit_window.winfo_screenheight() // 2 - 50
-        ))
-        
-        # 创建输入框
-        ttk.Label(edit_window, text="请输入新值:").pack(pady=5)
-        entry_var = tk.StringVar(value=current_value)
-        entry = ttk.Entry(edit_window, textvariable=entry_var, width=30)
-        entry.pack(pady=5)
-        entry.select_range(0, tk.END)
-        entry.focus()
-        
-        # 保存按钮
-        def save_edit():
-            new_value = entry_var.get()
-            values = list(self.class_tree.item(item, "values"))
-            values[col_index] = new_value
-            self.class_tree.item(item, values=values)
-            edit_window.destroy()
-        
-        # 按钮框架
-        button_frame = ttk.Frame(edit_window)
-        button_frame.pack(pady=5)
-        
-        ttk.Button(button_frame, text="保存", command=save_edit).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="取消", command=edit_window.destroy).pack(side=tk.LEFT, padx=5)
-        
-        # 绑定回车键保存
-        entry.bind("<Return>", lambda e: save_edit())
-        
-        # 等待窗口关闭
-        edit_window.wait_window()
-    
-    def load_class_data_to_tree(self):
-        """加载现有班级数据到表格"""
-        # 清空现有数据
-        for item in self.class_tree.get_children():
-            self.class_tree.delete(item)
-        
-        # 获取现有班级数据
-        current_classes = self.settings_manager.get_classes()
-        weighted_addition = self.settings_manager.get_weighted_addition()
-        
-        # 添加到表格
-        for class_name in current_classes:
-            weighted_score = weighted_addition.get(class_name, 0)
-            self.class_tree.insert("", "end", values=(class_name, str(weighted_score)))
-    
-    def on_class_select(self, event):
-        """处理班级选择事件"""
-        selected_items = self.class_tree.selection()
-        if selected_items:
-            self.selected_class_item = selected_items[0]
-        else:
-            self.selected_class_item = None
-    
-    def add_class(self):
-        # 弹出对话框让用户输入班级名称
-        new_class_name = tk.simpledialog.askstring("添加班级", "请输入班级名称:")
-        if not new_class_name:
-            return  # 用户取消了输入
-        
-        new_weighted_score = "0"
-        
-        # 检查是否已存在同名班级
-        existing_classes = [self.class_tree.item(item, "values")[0] for item in self.class_tree.get_children()]
-        if new_class_name in existing_classes:
-            messagebox.showwarning("警告", f"班级 '{new_class_name}' 已存在！")
-            return
-        
-        # 添加到表格
-        self.class_tree.insert("", "end", values=(new_class_name, new_weighted_score))
-    
-    def remove_class(self):
-        # 删除选中的班级
-        selected_items = self.class_tree.selection()
-        if not selected_items:
-            messagebox.showwarning("警告", "请先选择要删除的班级！")
-            return
-        
-        for item in selected_items:
-            self.class_tree.delete(item)
-        
-        # 保存更改
-        self.save_class_settings()
-    
-    def move_class_up(self):
-        """上移选中的班级"""
-        selected = self.class_tree.selection()
-        if not selected:
-            messagebox.showwarning("警告", "请先选择要移动的班级！")
-            return
-        
-        # 获取所有项目和选中项目的索引
-        all_items = self.class_tree.get_children()
-        selected_item = selected[0]
-        current_index = all_items.index(selected_item)
-        
-        # 如果已经在最顶部，则不移动
-        if current_index == 0:
-            return
-        
-        # 获取要交换位置的项目
-        prev_item = all_items[current_index - 1]
-        
-        # 获取两个项目的数据
-        selected_values = self.class_tree.item(selected_item, "values")
-        prev_values = self.class_tree.item(prev_item, "values")
-        
-        # 交换显示位置
-        self.class_tree.move(selected_item, "", current_index - 1)
-        
-        # 重新选择移动的项目
-        self.class_tree.selection_set(selected_item)
-    
-    def move_class_down(self):
-        """下移选中的班级"""
-        selected = self.class_tree.selection()
-        if not selected:
-            messagebox.showwarning("警告", "请先选择要移动的班级！")
-            return
-        
-        # 获取所有项目和选中项目的索引
-        all_items = self.class_tree.get_children()
-        selected_item = selected[0]
-        current_index = all_items.index(selected_item)
-        
-        # 如果已经在最底部，则不移动
-        if current_index == len(all_items) - 1:
-            return
-        
-        # 获取要交换位置的项目
-        next_item = all_items[current_index + 1]
-        
-        # 获取两个项目的数据
-        selected_values = self.class_tree.item(selected_item, "values")
-        next_values = self.class_tree.item(next_item, "values")
-        
-        # 交换显示位置
-        self.class_tree.move(selected_item, "", current_index + 1)
-        
-        # 重新选择移动的项目
-        self.class_tree.selection_set(selected_item)
-    
-    def save_class_settings(self):
-        try:
-            classes = []
-            weighted_addition = {}
-            
-            # 从表格中获取班级数据，保持顺序
-            for item in self.class_tree.get_children():
-                values = self.class_tree.item(item, "values")
-                class_name = values[0].strip()
-                if class_name:
-                    classes.append(class_name)
-                    
-                    # 获取加权分数
-                    try:
-                        weighted_value = float(values[1])
-                    except ValueError:
-                        weighted_value = 0
-                    weighted_addition[class_name] = weighted_value
-            
-            self.settings_manager.set_classes(classes)
-            self.settings_manager.set_weighted_addition(weighted_addition)
-            
-            self.classes = classes
-            self.weighted_addition = weighted_addition.copy()
-            
-            # 更新主窗口的班级下拉列表
-            if self.class_combobox is not None:
-                self.class_combobox['values'] = self.classes
-            
-            # 保存到班级配置文件
-            self.save_class_config_file()
-            
-            messagebox.showinfo("设置", "班级设置已保存")
-            self.log_manager.log("班级设置已保存")
-        except Exception as e:
-            messagebox.showerror("错误", f"保存班级设置时出错：{str(e)}")
-            self.log_manager.log(f"保存班级设置时出错: {str(e)}")
-    
-    def save_class_config_file(self):
-        """保存班级配置到独立的JSON文件"""
-        try:
-            class_config = {
-                "classes": self.classes,
-                "weighted_addition": self.weighted_addition
-            }
-            
-            # 使用固定文件名保存班级配置
-            config_file = os.path.join(self.settings_manager.get_root_directory(), "class_config.json")
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(class_config, f, ensure_ascii=False, indent=2, default=str)
-            
-            self.log_manager.log(f"班级配置已保存到 {config_file}")
-        except Exception as e:
-            messagebox.showerror("错误", f"保存班级配置文件时出错：{str(e)}")
-            self.log_manager.log(f"保存班级配置文件时出错: {str(e)}")
-    
-    def load_class_config_file(self):
-        """从独立的JSON文件加载班级配置"""
-        try:
-            config_file = os.path.join(self.settings_manager.get_root_directory(), "class_config.json")
-            if os.path.exists(config_file):
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    class_config = json.load(f)
-                
-                # 更新班级和加权分数
-                self.classes = class_config.get("classes", [])
-                self.weighted_addition = class_config.get("weighted_addition", {})
-                
-                # 更新设置管理器
-                self.settings_manager.set_classes(self.classes)
-                self.settings_manager.set_weighted_addition(self.weighted_addition)
-                
-                # 更新表格显示
-                self.update_class_tree_from_config()
-                
-                # 更新主窗口的班级下拉列表
-                if self.class_combobox is not None:
-                    self.class_combobox['values'] = self.classes
-                
-                self.log_manager.log(f"班级配置已从 {config_file} 加载")
-                return True
-            else:
-                self.log_manager.log("班级配置文件不存在，使用默认配置")
-                return False
-        except Exception as e:
-            messagebox.showerror("错误", f"加载班级配置文件时出错：{str(e)}")
-            self.log_manager.log(f"加载班级配置文件时出错: {str(e)}")
-            return False
-    
-    def update_class_tree_from_config(self):
-        """根据配置更新班级表格显示"""
-        # 清空现有数据
-        for item in self.class_tree.get_children():
-            self.class_tree.delete(item)
-        
-        # 添加班级数据到表格
-        for class_name in self.classes:
-            weighted_score = self.weighted_addition.get(class_name, 0)
-            self.class_tree.insert("", "end", values=(class_name, weighted_score))
-    
-    def show_about(self):
-        about_window = tk.Toplevel(self.root)
-        about_window.title("关于流动红旗评比系统")
-        about_window.geometry("720x650")
-        about_window.resizable(True, True)
-        about_window.configure(bg="#f5f5f5")
-        
-        about_window.transient(self.root)
-        about_window.grab_set()
-        
-        # 创建主框架
-        main_frame = ttk.Frame(about_window, padding="20")
-        main_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # 标题区域
-        title_frame = ttk.Frame(main_frame)
-        title_frame.pack(fill=tk.X, pady=(0, 20))
-        
-        title_label = ttk.Label(
-            title_frame, 
-            text="流动红旗评比系统", 
-            font=("微软雅黑", 20, "bold"),
-            foreground="#2c3e50"
-        )
-        title_label.pack()
-        
-        subtitle_label = ttk.Label(
-            title_frame,
-            text="学校流动红旗评比管理系统",
-            font=("微软雅黑", 10),
-            foreground="#7f8c8d"
-        )
-        subtitle_label.pack(pady=(5, 0))
-        
-        # 内容区域
-        content_frame = ttk.Frame(main_frame)
-        content_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # 左侧信息区域
-        left_frame = ttk.Frame(content_frame)
-        left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
-        
-        # 版本信息
-        version_frame = ttk.LabelFrame(left_frame, text="版本信息", padding="10")
-        version_frame.pack(fill=tk.X, pady=(0, 15))
-        
-        ttk.Label(version_frame, text="版本: V1.5.0", font=("微软雅黑", 11, "bold")).pack(anchor=tk.W)
-        ttk.Label(version_frame, text="发布日期: 2025年", font=("微软雅黑", 10)).pack(anchor=tk.W, pady=(5, 0))
-        
-        # 开发者信息
-        dev_frame = ttk.LabelFrame(left_frame, text="开发者信息", padding="10")
-        dev_frame.pack(fill=tk.X, pady=(0, 15))
-        
-        github_link = "https://github.com/Bao-Jiaozixing/flowing-red-flag-evaluation"
-        link_label = ttk.Label(dev_frame, text=f"开发团队: {github_link}", font=("微软雅黑", 10), foreground="blue", cursor="hand2")
-        link_label.pack(anchor=tk.W)
-        link_label.bind("<Button-1>", lambda e: self.open_link(github_link))
-        
-        # 系统功能
-        info_frame = ttk.LabelFrame(left_frame, text="系统功能", padding="10")
-        info_frame.pack(fill=tk.BOTH, expand=True)
-        
-        ttk.Label(info_frame, text="支持功能:", font=("微软雅黑", 10, "bold")).pack(anchor=tk.W)
-        
-        features = [
-            "• 日常评分管理", "• 惩罚加分管理", "• 数据导入导出",
-            "• 自动计算总分", "• 班级排名显示", "• 历史记录保存"
-        ]
-        
-        for feature in features:
-            ttk.Label(info_frame, text=feature, font=("微软雅黑", 9)).pack(anchor=tk.W, padx=(10, 0), pady=2)
-        
-        # 右侧信息区域
-        right_frame = ttk.Frame(content_frame)
-        right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(10, 0))
-        
-        # 使用模型
-        model_frame = ttk.LabelFrame(right_frame, text="使用模型", padding="10")
-        model_frame.pack(fill=tk.X, pady=(0, 15))
-        
-        models = [
-            "• Deepseek-V3",
-            "• Deepseek-R1",
-            "• Qwen-3-Coder"
-        ]
-        
-        for model in models:
-            ttk.Label(model_frame, text=model, font=("微软雅黑", 9)).pack(anchor=tk.W, pady=1)
-        
-        # 第三方库声明
-        license_frame = ttk.LabelFrame(right_frame, text="第三方库声明", padding="10")
-        license_frame.pack(fill=tk.BOTH, expand=True)
-        
-        libraries = [
-            "• tkinter - Python标准GUI库",
-            "• pandas - 数据处理库 (用于Excel导出)",
-            "• openpyxl - Excel文件处理库 (pandas依赖)"
-        ]
-        
-        for library in libraries:
-            ttk.Label(license_frame, text=library, font=("微软雅黑", 9)).pack(anchor=tk.W, padx=(0, 0), pady=1)
-        
-        # 底部版权信息
-        copyright_frame = ttk.Frame(main_frame)
-        copyright_frame.pack(fill=tk.X, pady=(20, 0))
-        
-        ttk.Separator(copyright_frame, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=(0, 10))
-        
-        ttk.Label(
-            copyright_frame, 
-            text="© 2025 流动红旗评比系统. 保留所有权利.", 
-            font=("微软雅黑", 9), 
-            foreground="#95a5a6"
-        ).pack()
-        
-        # 关闭按钮
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(fill=tk.X, pady=(20, 0))
-        
-        close_button = ttk.Button(
-            button_frame, 
-            text="关闭", 
-            command=about_window.destroy,
-            width=15
-        )
-        close_button.pack(side=tk.RIGHT)
-
-    def open_link(self, url):
-        import webbrowser
-        webbrowser.open_new(url)
-
-    def save_data(self):
-        try:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            default_filename = f"流动红旗分数数据_{timestamp}.json"
-            
-            file_path = filedialog.asksaveasfilename(
-                initialfile=default_filename,
-                defaultextension=".json",
-                filetypes=[("JSON文件", "*.json"), ("所有文件", "*.*")],
-                title="保存数据",
-                initialdir=self.settings_manager.get_root_directory()
-            )
-            
-            if not file_path:
-                self.log_manager.log("用户取消了保存操作")
-                return
-            
-            self.log_manager.log(f"用户选择的文件路径: {file_path}")
-            
-            # 验证文件路径
-            if not file_path.strip():
-                error_msg = "文件路径不能为空"
-                self.root.lift()
-                self.root.focus_force()
-                messagebox.showerror("错误", error_msg)
-                self.log_manager.log(f"保存数据时出错: {error_msg}")
-                return
-            
-            # 规范化路径
-            file_path = os.path.normpath(file_path)
-            self.log_manager.log(f"规范化后的文件路径: {file_path}")
-            
-            # 获取目录路径并确保存在
-            directory = os.path.dirname(file_path)
-            self.log_manager.log(f"目录路径: {directory}")
-            
-            if directory:
-                # 检查目录是否存在，如果不存在则创建
-                if not os.path.exists(directory):
-                    self.log_manager.log(f"目录不存在，尝试创建目录: {directory}")
-                    try:
-                        os.makedirs(directory, exist_ok=True)
-                        self.log_manager.log(f"目录创建成功: {directory}")
-                    except PermissionError as e:
-                        error_msg = f"没有权限创建目录: {directory}，请检查权限或选择其他位置"
-                        self.root.lift()
-                        self.root.focus_force()
-                        messagebox.showerror("权限错误", error_msg)
-                        self.log_manager.log(f"保存数据时出错: {error_msg}，详细错误: {str(e)}")
-                        return
-                    except Exception as e:
-                        error_msg = f"创建目录时出错: {directory}，错误信息: {str(e)}"
-                        self.root.lift()
-                        self.root.focus_force()
-                        messagebox.showerror("错误", error_msg)
-                        self.log_manager.log(f"保存数据时出错: {error_msg}")
-                        return
-                # 检查目录是否可写
-                elif not os.access(directory, os.W_OK):
-                    error_msg = f"目录没有写入权限: {directory}"
-                    self.root.lift()
-                    self.root.focus_force()
-                    messagebox.showerror("权限错误", error_msg)
-                    self.log_manager.log(f"保存数据时出错: {error_msg}")
-                    return
-            
-            # 检查文件是否可写（如果文件已存在）
-            if os.path.exists(file_path) and not os.access(file_path, os.W_OK):
-                error_msg = f"文件没有写入权限: {file_path}"
-                self.root.lift()
-                self.root.focus_force()
-                messagebox.showerror("权限错误", error_msg)
-                self.log_manager.log(f"保存数据时出错: {error_msg}")
-                return
-            
-            data = {
-                'scores': self.get_all_scores(),
-                'punishments': self.punishments,
-                'weighted_addition': self.weighted_addition,
-                'classes': self.settings_manager.get_classes(),
-                'save_time': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            # 保存历史记录用于撤销操作
-            self.save_snapshot()
-            
-            self.update_status("数据保存成功")
-            self.log_manager.log("数据保存成功")
-            messagebox.showinfo("成功", f"数据已保存到 {file_path}")
-        except PermissionError as e:
-            error_msg = f"没有权限保存到指定位置，请选择其他位置或以管理员身份运行程序: {str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("权限错误", error_msg)
-            self.log_manager.log(f"保存数据时出错: {error_msg}")
-        except FileNotFoundError as e:
-            error_msg = f"指定的文件路径不存在，请检查路径是否正确: {str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("路径错误", error_msg)
-            self.log_manager.log(f"保存数据时出错: {error_msg}")
-        except OSError as e:
-            error_msg = f"操作系统错误: {str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("系统错误", error_msg)
-            self.log_manager.log(f"保存数据时出错: {error_msg}")
-        except Exception as e:
-            error_msg = f"保存数据时出错：{str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("错误", error_msg)
-            self.log_manager.log(f"保存数据时出错: {error_msg}")
-    
-    def save_as_data(self):
-        try:
-            data = {
-                'scores': self.get_all_scores(),
-                'punishments': self.punishments,
-                'weighted_addition': self.weighted_addition,
-                'classes': self.settings_manager.get_classes(),
-                'save_time': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".json",
-                filetypes=[("JSON文件", "*.json"), ("所有文件", "*.*")],
-                title="另存为"
-            )
-            
-            if not file_path:
-                self.log_manager.log("用户取消了另存为操作")
-                return
-            
-            self.log_manager.log(f"用户选择的文件路径: {file_path}")
-            
-            # 验证文件路径
-            if not file_path.strip():
-                error_msg = "文件路径不能为空"
-                self.root.lift()
-                self.root.focus_force()
-                messagebox.showerror("错误", error_msg)
-                self.log_manager.log(f"另存为数据时出错: {error_msg}")
-                return
-            
-            # 规范化路径
-            file_path = os.path.normpath(file_path)
-            self.log_manager.log(f"规范化后的文件路径: {file_path}")
-            
-            # 获取目录路径并确保存在
-            directory = os.path.dirname(file_path)
-            self.log_manager.log(f"目录路径: {directory}")
-            
-            if directory:
-                # 检查目录是否存在，如果不存在则创建
-                if not os.path.exists(directory):
-                    self.log_manager.log(f"目录不存在，尝试创建目录: {directory}")
-                    try:
-                        os.makedirs(directory, exist_ok=True)
-                        self.log_manager.log(f"目录创建成功: {directory}")
-                    except PermissionError as e:
-                        error_msg = f"没有权限创建目录: {directory}，请检查权限或选择其他位置"
-                        self.root.lift()
-                        self.root.focus_force()
-                        messagebox.showerror("权限错误", error_msg)
-                        self.log_manager.log(f"另存为数据时出错: {error_msg}，详细错误: {str(e)}")
-                        return
-                    except Exception as e:
-                        error_msg = f"创建目录时出错: {directory}，错误信息: {str(e)}"
-                        self.root.lift()
-                        self.root.focus_force()
-                        messagebox.showerror("错误", error_msg)
-                        self.log_manager.log(f"另存为数据时出错: {error_msg}")
-                        return
-                # 检查目录是否可写
-                elif not os.access(directory, os.W_OK):
-                    error_msg = f"目录没有写入权限: {directory}"
-                    self.root.lift()
-                    self.root.focus_force()
-                    messagebox.showerror("权限错误", error_msg)
-                    self.log_manager.log(f"另存为数据时出错: {error_msg}")
-                    return
-            
-            # 检查文件是否可写（如果文件已存在）
-            if os.path.exists(file_path) and not os.access(file_path, os.W_OK):
-                error_msg = f"文件没有写入权限: {file_path}"
-                self.root.lift()
-                self.root.focus_force()
-                messagebox.showerror("权限错误", error_msg)
-                self.log_manager.log(f"另存为数据时出错: {error_msg}")
-                return
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            self.history_manager.add_record(data)
-            self.update_status(f"数据已另存为 {file_path}")
-            self.log_manager.log(f"数据另存为: {file_path}")
-            messagebox.showinfo("成功", f"数据已另存为 {file_path}")
-        except PermissionError as e:
-            error_msg = f"没有权限保存到指定位置，请选择其他位置或以管理员身份运行程序: {str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("权限错误", error_msg)
-            self.log_manager.log(f"另存为数据时出错: {error_msg}")
-        except FileNotFoundError as e:
-            error_msg = f"指定的文件路径不存在，请检查路径是否正确: {str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("路径错误", error_msg)
-            self.log_manager.log(f"另存为数据时出错: {error_msg}")
-        except OSError as e:
-            error_msg = f"操作系统错误: {str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("系统错误", error_msg)
-            self.log_manager.log(f"另存为数据时出错: {error_msg}")
-        except Exception as e:
-            error_msg = f"另存为数据时出错：{str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("错误", error_msg)
-            self.log_manager.log(f"另存为数据时出错: {error_msg}")
-    
-    def save_total_score_table(self):
-        try:
-            self.calculate_totals()
-            
-            data = []
-            columns = ["班级", "早迟到", "早读", "节能开窗", "仪容仪表", "间操", "午休", 
-                      "上下午各班卫生", "巡视", "及时上交文件", "宿舍", "加权", "惩罚", "惩罚备注", "总分"]
-            
-            for cls in self.classes:
-                row = [cls]
-                for page_name in self.items:
-                    max_score = self.settings_manager.get_max_score(page_name)
-                    
-                    if page_name in self.dual_period_items:
-                        am_avg = self.get_class_average(self.pages[page_name].am_tree, cls)
-                        pm_avg = self.get_class_average(self.pages[page_name].pm_tree, cls)
-                        avg_score = (am_avg + pm_avg) / 2
-                        row.append(round(avg_score, 2))
-                    else:
-                        for widget in self.pages[page_name].winfo_children():
-                            if isinstance(widget, ttk.Treeview):
-                                for item in widget.get_children():
-                                    item_values = widget.item(item, "values")
-                                    if item_values[0] == cls:
-                                        row.append(item_values[6])
-                                        break
-                row.append(self.weighted_addition[cls])
-                punishment_score = 0
-                punishment_notes = []
-                if cls in self.punishments:
-                    for punishment in self.punishments[cls]:
-                        if punishment["type"] == "add":
-                            punishment_score += punishment["score"]
-                        elif punishment["type"] == "subtract":
-                            punishment_score -= punishment["score"]
-                        punishment_notes.append(punishment["note"])
-                row.append(punishment_score)
-                row.append("\n".join(punishment_notes))
-                total_score = sum(map(float, row[1:-2])) + row[-2]
-                row.append(round(total_score, 2))
-                
-                data.append(row)
-            
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV文件", "*.csv"), ("Excel文件", "*.xlsx"), ("PDF文件", "*.pdf"), ("所有文件", "*.*")],
-                title="保存总分表格"
-            )
-            
-            # 检查用户是否取消了保存操作
-            if not file_path:
-                self.log_manager.log("用户取消了保存总分表格操作")
-                return
-            
-            self.log_manager.log(f"用户选择的文件路径: {file_path}")
-            
-            # 验证文件路径
-            if not file_path.strip():
-                error_msg = "文件路径不能为空"
-                self.root.lift()
-                self.root.focus_force()
-                messagebox.showerror("错误", error_msg)
-                self.log_manager.log(f"保存总分表格时出错: {error_msg}")
-                return
-            
-            # 规范化路径
-            file_path = os.path.normpath(file_path)
-            self.log_manager.log(f"规范化后的文件路径: {file_path}")
-            
-            # 获取目录路径并确保存在
-            directory = os.path.dirname(file_path)
-            self.log_manager.log(f"目录路径: {directory}")
-            
-            if directory:
-                # 检查目录是否存在，如果不存在则创建
-                if not os.path.exists(directory):
-                    self.log_manager.log(f"目录不存在，尝试创建目录: {directory}")
-                    try:
-                        os.makedirs(directory, exist_ok=True)
-                        self.log_manager.log(f"目录创建成功: {directory}")
-                    except PermissionError as e:
-                        error_msg = f"没有权限创建目录: {directory}，请检查权限或选择其他位置"
-                        self.root.lift()
-                        self.root.focus_force()
-                        messagebox.showerror("权限错误", error_msg)
-                        self.log_manager.log(f"保存总分表格时出错: {error_msg}，详细错误: {str(e)}")
-                        return
-                    except Exception as e:
-                        error_msg = f"创建目录时出错: {directory}，错误信息: {str(e)}"
-                        self.root.lift()
-                        self.root.focus_force()
-                        messagebox.showerror("错误", error_msg)
-                        self.log_manager.log(f"保存总分表格时出错: {error_msg}")
-                        return
-                # 检查目录是否可写（注释：这是额外的权限检查）
-                elif not os.access(directory, os.W_OK):
-                    error_msg = f"目录没有写入权限: {directory}"
-                    self.root.lift()
-                    self.root.focus_force()
-                    messagebox.showerror("权限错误", error_msg)
-                    self.log_manager.log(f"保存总分表格时出错: {error_msg}")
-                    return
-            
-            # 检查文件是否可写（如果文件已存在）（注释：这是额外的权限检查）
-            if os.path.exists(file_path) and not os.access(file_path, os.W_OK):
-                error_msg = f"文件没有写入权限: {file_path}"
-                self.root.lift()
-                self.root.focus_force()
-                messagebox.showerror("权限错误", error_msg)
-                self.log_manager.log(f"保存总分表格时出错: {error_msg}")
-                return
-                
-            if file_path.endswith('.csv'):
-                import csv
-                with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(columns)
-                    writer.writerows(data)
-            elif file_path.endswith('.xlsx'):
-                try:
-                    import pandas as pd
-                    df = pd.DataFrame(data, columns=columns)
-                    df.to_excel(file_path, index=False)
-                except ImportError:
-                    error_msg = "未安装pandas库，无法导出Excel\n请运行: pip install pandas openpyxl"
-                    self.root.lift()
-                    self.root.focus_force()
-                    messagebox.showerror("错误", error_msg)
-                    self.log_manager.log(f"保存总分表格时出错: {error_msg}")
-                    return
-            elif file_path.endswith('.pdf'):
-                try:
-                    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-                    from reportlab.lib.pagesizes import letter, A4
-                    from reportlab.lib import colors
-                    from reportlab.lib.styles import getSampleStyleSheet
-                    from reportlab.pdfbase import pdfmetrics
-                    from reportlab.pdfbase.ttfonts import TTFont
-                    from reportlab.lib.units import inch
-                    import os
-                    
-                    # 注册中文字体（如果需要）
-                    font_path = os.path.join(os.path.dirname(__file__), 'SimSun.ttf')
-                    if os.path.exists(font_path):
-                        pdfmetrics.registerFont(TTFont('SimSun', font_path))
-                    else:
-                        # 如果找不到字体文件，尝试使用系统默认中文字体
-                        try:
-                            pdfmetrics.registerFont(TTFont('SimSun', 'C:/Windows/Fonts/simsun.ttc'))
-                        except:
-                            pass  # 如果仍然找不到字体，则使用默认字体（可能仍显示为方框）
-                    
-                    doc = SimpleDocTemplate(file_path, pagesize=A4)
-                    elements = []
-                    
-                    # 添加标题
-                    styles = getSampleStyleSheet()
-                    # 设置标题字体为中文字体
-                    from reportlab.lib.styles import ParagraphStyle
-                    title_style = ParagraphStyle(
-                        'CustomTitle',
-                        parent=styles['Title'],
-                        fontName='SimSun',
-                        fontSize=24
-                    )
-                    title = Paragraph("流动红旗评比总分表格", title_style)
-                    elements.append(title)
-                    
-                    # 准备表格数据
-                    table_data = [columns] + data
-                    
-                    # 创建表格
-                    table = Table(table_data)
-                    table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                        ('FONTNAME', (0, 0), (-1, 0), 'SimSun'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 10),
-                        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                        ('FONTNAME', (0, 1), (-1, -1), 'SimSun')
-                    ]))
-                    
-                    elements.append(table)
-                    doc.build(elements)
-                except ImportError:
-                    error_msg = "未安装reportlab库，无法导出PDF\n请运行: pip install reportlab"
-                    self.root.lift()
-                    self.root.focus_force()
-                    messagebox.showerror("错误", error_msg)
-                    self.log_manager.log(f"保存总分表格时出错: {error_msg}")
-                    return
-            else:
-                import csv
-                with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(columns)
-                    writer.writerows(data)
-            
-            self.update_status(f"总分表格已保存到 {file_path}")
-            self.log_manager.log(f"总分表格已保存到: {file_path}")
-            messagebox.showinfo("成功", f"总分表格已保存到 {file_path}")
-        except PermissionError as e:
-            error_msg = f"没有权限保存到指定位置，请选择其他位置或以管理员身份运行程序: {str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("权限错误", error_msg)
-            self.log_manager.log(f"保存总分表格时出错: {error_msg}")
-        except FileNotFoundError as e:
-            error_msg = f"指定的文件路径不存在，请检查路径是否正确: {str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("路径错误", error_msg)
-            self.log_manager.log(f"保存总分表格时出错: {error_msg}")
-        except OSError as e:
-            error_msg = f"操作系统错误: {str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("系统错误", error_msg)
-            self.log_manager.log(f"保存总分表格时出错: {error_msg}")
-        except Exception as e:
-            error_msg = f"保存总分表格时出错：{str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("错误", error_msg)
-            self.log_manager.log(f"保存总分表格时出错: {error_msg}")
-    
-    def on_closing(self):
-        if hasattr(self, 'time_after_id'):
-            self.root.after_cancel(self.time_after_id)
-        self.root.destroy()
-    
-    def load_data(self):
-        try:
-            data_file = filedialog.askopenfilename(
-                defaultextension=".json",
-                filetypes=[("JSON文件", "*.json"), ("所有文件", "*.*")],
-                title="选择要加载的数据文件"
-            )
-            
-            # 检查用户是否取消了加载操作
-            if not data_file:
-                self.log_manager.log("用户取消了加载数据操作")
-                return
-            
-            self.log_manager.log(f"用户选择的数据文件: {data_file}")
-            
-            # 检查文件是否存在
-            if not os.path.exists(data_file):
-                error_msg = f"指定的数据文件不存在: {data_file}"
-                self.root.lift()
-                self.root.focus_force()
-                messagebox.showerror("文件错误", error_msg)
-                self.log_manager.log(f"加载数据时出错: {error_msg}")
-                return
-            
-            # 检查文件是否可读
-            if not os.access(data_file, os.R_OK):
-                error_msg = f"没有权限读取文件: {data_file}"
-                self.root.lift()
-                self.root.focus_force()
-                messagebox.showerror("权限错误", error_msg)
-                self.log_manager.log(f"加载数据时出错: {error_msg}")
-                return
-            
-            with open(data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            # 直接同步班级设置
-            loaded_classes = data.get('classes', self.settings_manager.get_classes())
-            loaded_scores = data.get('scores', {})
-            
-            # 同步班级设置
-            self.settings_manager.set_classes(loaded_classes)
-            self.classes = loaded_classes
-            
-            # 更新加权分数设置以匹配新班级
-            loaded_weighted_addition = data.get('weighted_addition', {})
-            for cls in loaded_classes:
-                if cls not in loaded_weighted_addition:
-                    loaded_weighted_addition[cls] = 0  # 默认加权分数为0
-            self.settings_manager.set_weighted_addition(loaded_weighted_addition)
-            self.weighted_addition = loaded_weighted_addition.copy()
-                
-            self.load_scores(loaded_scores)
-            self.punishments = data.get('punishments', {})
-            weighted_data = data.get('weighted_addition', {})
-            self.weighted_addition.update(weighted_data)
-            
-            # self.classes已在此前设置为loaded_classes，无需重复设置
-            # self.classes = loaded_classes
-            
-            self.update_status("数据加载成功")
-            self.log_manager.log("数据加载成功")
-            messagebox.showinfo("成功", f"数据已从 {data_file} 加载")
-        except FileNotFoundError as e:
-            error_msg = f"未找到指定的数据文件: {str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("文件错误", error_msg)
-            self.log_manager.log(f"加载数据时出错: {error_msg}")
-        except PermissionError as e:
-            error_msg = f"没有权限读取数据文件，请检查文件权限: {str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("权限错误", error_msg)
-            self.log_manager.log(f"加载数据时出错: {error_msg}")
-        except json.JSONDecodeError as e:
-            error_msg = f"数据文件格式错误，无法解析JSON: {str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("格式错误", error_msg)
-            self.log_manager.log(f"加载数据时出错: {error_msg}")
-        except Exception as e:
-            error_msg = f"加载数据时出错：{str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("错误", error_msg)
-            self.log_manager.log(f"加载数据时出错: {error_msg}")
-    
-    def get_all_scores(self):
-        scores = {}
-        for page_name, page_frame in self.pages.items():
-            if page_name in self.dual_period_items:
-                scores[f"{page_name}_am"] = self.get_tree_data(page_frame.am_tree)
-                scores[f"{page_name}_pm"] = self.get_tree_data(page_frame.pm_tree)
-            else:
-                for widget in page_frame.winfo_children():
-                    if isinstance(widget, ttk.Treeview):
-                        scores[page_name] = self.get_tree_data(widget)
-                        break
-        return scores
-    
-    def get_tree_data(self, tree):
-        return [tree.item(item, "values") for item in tree.get_children()]
-    
-    def save_snapshot(self):
-        snapshot = {
-            'scores': self.get_all_scores(),
-            'punishments': self.punishments.copy(),
-            'weighted_addition': self.weighted_addition.copy()
-        }
-        self.history_manager.add_record(snapshot)
-    
-    def load_scores(self, scores_data):
-        # 批量更新优化：禁用界面刷新以提高加载速度
-        for page in self.pages.values():
-            if hasattr(page, 'am_tree'):
-                page.am_tree.config(selectmode='none')
-            if hasattr(page, 'pm_tree'):
-                page.pm_tree.config(selectmode='none')
-            for widget in page.winfo_children():
-                if isinstance(widget, ttk.Treeview):
-                    widget.config(selectmode='none')
-        
-        # 加载数据
-        for page_name, page_data in scores_data.items():
-            if page_name.endswith("_am") and len(page_name) > 3:
-                real_page_name = page_name[:-3]
-                if real_page_name in self.dual_period_items and real_page_name in self.pages:
-                    self.set_tree_data(self.pages[real_page_name].am_tree, page_data)
-            elif page_name.endswith("_pm") and len(page_name) > 3:
-                real_page_name = page_name[:-3]
-                if real_page_name in self.dual_period_items and real_page_name in self.pages:
-                    self.set_tree_data(self.pages[real_page_name].pm_tree, page_data)
-            elif page_name in self.pages:
-                for widget in self.pages[page_name].winfo_children():
-                    if isinstance(widget, ttk.Treeview):
-                        self.set_tree_data(widget, page_data)
-                        break
-        
-        # 恢复界面刷新
-        for page in self.pages.values():
-            if hasattr(page, 'am_tree'):
-                page.am_tree.config(selectmode='browse')
-            if hasattr(page, 'pm_tree'):
-                page.pm_tree.config(selectmode='browse')
-            for widget in page.winfo_children():
-                if isinstance(widget, ttk.Treeview):
-                    widget.config(selectmode='browse')
-    
-    def set_tree_data(self, tree, data):
-        # 使用更高效的方式更新Treeview数据
-        children = tree.get_children()
-        for i, item_data in enumerate(data):
-            if i < len(children):
-                tree.item(children[i], values=item_data)
-            else:
-                break
-    
-
-
-    
-    def show_history(self):
-        try:
-            history_window = tk.Toplevel(self.root)
-            history_window.title("历史记录")
-            history_window.geometry("800x500")
-            history_window.transient(self.root)
-            
-            main_frame = ttk.Frame(history_window)
-            main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-            
-            columns = ("保存时间", "操作")
-            tree = ttk.Treeview(main_frame, columns=columns, show="headings")
-            tree.heading("保存时间", text="保存时间")
-            tree.heading("操作", text="操作")
-            tree.column("保存时间", width=200)
-            tree.column("操作", width=300)
-            
-            tree.pack(fill=tk.BOTH, expand=True)
-            
-            scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=tree.yview)
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            tree.configure(yscrollcommand=scrollbar.set)
-            
-            history = self.history_manager.get_history()
-            self.log_manager.log(f"获取到 {len(history)} 条历史记录")
-            
-            for record in history:
-                tree.insert("", "end", values=(record['date'], "保存数据"))
-            
-            load_frame = ttk.Frame(history_window)
-            load_frame.pack(fill=tk.X, padx=10, pady=5)
-            
-            def load_selected():
-                selected = tree.selection()
-                if not selected:
-                    error_msg = "请选择一条历史记录"
-                    self.root.lift()
-                    self.root.focus_force()
-                    messagebox.showerror("选择错误", error_msg)
-                    self.log_manager.log(f"加载历史记录时出错: {error_msg}")
-                    return
-                
-                item = selected[0]
-                index = tree.index(item)
-                
-                history = self.history_manager.get_history()
-                if 0 <= index < len(history):
-                    try:
-                        record_data = history[index]['data']
-                        self.load_scores(record_data.get('scores', {}))
-                        self.punishments = record_data.get('punishments', {}).copy()
-                        weighted_data = record_data.get('weighted_addition', {})
-                        self.weighted_addition.clear()
-                        self.weighted_addition.update(weighted_data)
-                        self.update_status(f"已加载历史记录: {history[index]['date']}")
-                        self.log_manager.log(f"加载历史记录: {history[index]['date']}")
-                        self.calculate_totals()  # 重新计算总分
-                        history_window.destroy()
-                    except Exception as e:
-                        error_msg = f"加载历史记录时出错：{str(e)}"
-                        self.root.lift()
-                        self.root.focus_force()
-                        messagebox.showerror("错误", error_msg)
-                        self.log_manager.log(f"加载历史记录时出错: {error_msg}")
-                else:
-                    error_msg = f"无法加载选中的记录：索引 {index} 超出范围 [0, {len(history)})"
-                    self.root.lift()
-                    self.root.focus_force()
-                    messagebox.showerror("索引错误", error_msg)
-                    self.log_manager.log(f"加载历史记录时出错: {error_msg}")
-            
-            ttk.Button(load_frame, text="加载选中记录", command=load_selected).pack(side=tk.LEFT)
-        except Exception as e:
-            error_msg = f"显示历史记录窗口时出错：{str(e)}"
-            self.root.lift()
-            self.root.focus_force()
-            messagebox.showerror("错误", error_msg)
-            self.log_manager.log(f"显示历史记录时出错: {error_msg}")
-    
-    def undo_action(self):
-        if self.history_manager.can_undo():
-            previous_data = self.history_manager.undo()
-            if previous_data:
-                self.load_scores(previous_data.get('scores', {}))
-                self.punishments = previous_data.get('punishments', {}).copy()
-                weighted_data = previous_data.get('weighted_addition', {})
-                self.weighted_addition.clear()
-                self.weighted_addition.update(weighted_data)
-                self.update_status("已撤销操作")
-                self.log_manager.log("执行撤销操作")
-                self.calculate_totals()
-            else:
-                self.update_status("无法撤销操作")
-        else:
-            self.update_status("没有可撤销的操作")
-            self.log_manager.log("尝试撤销操作但没有历史记录")
-    
-    def redo_action(self):
-        if self.history_manager.can_redo():
-            next_data = self.history_manager.redo()
-            if next_data:
-                self.load_scores(next_data.get('scores', {}))
-                self.punishments = next_data.get('punishments', {}).copy()
-                weighted_data = next_data.get('weighted_addition', {})
-                self.weighted_addition.clear()
-                self.weighted_addition.update(weighted_data)
-                self.update_status("已重做操作")
-                self.log_manager.log("执行重做操作")
-                self.calculate_totals()
-            else:
-                self.update_status("无法重做操作")
-        else:
-            self.update_status("没有可重做的操作")
-            self.log_manager.log("尝试重做操作但没有历史记录")
-    
-    def toggle_fullscreen(self):
-        self.root.attributes('-fullscreen', not self.root.attributes('-fullscreen'))
-    
-    def on_tab_change(self, event):
-        self.destroy_entry()
-    
-    def on_click_anywhere(self, event):
-        self.destroy_entry()
-    
-    def destroy_entry(self):
-        for widget in self.root.winfo_children():
-            if isinstance(widget, ttk.Entry) and widget.winfo_viewable():
-                widget.destroy()
-    
-    def switch_language(self, language):
-        """切换语言"""
-        self.settings_manager.set_language(language)
-        messagebox.showinfo("语言切换", "语言设置已保存，请重启程序以应用更改")
-        self.log_manager.log(f"语言已切换为: {language}")
-    
-    # 多语言支持字典
-    language_dict = {
-        'zh': {
-            'file': '文件',
-            'edit': '编辑',
-            'view': '视图',
-            'data': '数据',
-            'settings': '设置',
-            'tools': '工具',
-            'help': '帮助',
-            'save_data': '保存数据',
-            'save_as': '另存为',
-            'load_data': '加载数据',
-            'export_table': '导出总分表格',
-            'exit': '退出',
-            'undo': '撤销',
-            'redo': '重做',
-            'reset_data': '复原数据',
-            'toggle_fullscreen': '全屏切换',
-            'manage_punishments': '奖惩管理',
-            'history': '历史记录',
-            'system_settings': '系统设置',
-            'calculate_total': '计算总分',
-            'output_table': '输出表格',
-            'evaluation_result': '评比结果',
-            'export_table_alt': '导出表格',
-            'about': '关于系统',
-            'language': '语言',
-            'chinese': '中文'
-        }
-    }
-
-if __name__ == "__main__":
-    root = tk.Tk()  # 使用标准的tk.Tk
-    
-    try:
-        root.iconbitmap('icon.ico')
-    except tk.TclError:
-        print("无法加载图标文件，请确保icon.ico文件存在于程序目录中")
-    
-    if chinese_font:
-        root.option_add("*Font", (chinese_font, 9))
-    
-    app = FlowingRedFlagEvaluationSystem(root)
-    root.protocol("WM_DELETE_WINDOW", app.on_closing)
+# 流动红旗评比系统 (Flowing Red Flag Evaluation System)
+# Copyright (C) 2025 流动红旗评比系统开发团队
+#
+# 本程序是自由软件：您可以根据自由软件基金会发布的GNU Affero通用公共许可证版本3
+# 或（您选择的）任何 later version 的条款重新分发和/或修改它。
+#
+# 本程序的分发是希望它能发挥作用，但不提供任何担保；甚至没有适销性或特定用途适用性的隐含保证。
+# 有关详细信息，请参阅GNU Affero通用公共许可证。
+#
+# 您应该已经收到了GNU Affero通用公共许可证的副本。如果没有，请参见<http://www.gnu.org/licenses/>。
+#
+# 本项目采用 Creative Commons Attribution-ShareAlike 3.0 Unported License (CC-BY-SA 3.0)
+# 您可以自由地共享和演绎本作品，但必须署名并以相同方式共享。
+#
+# 更多信息请查看项目根目录的 LICENSE 文件和 README.md 文件。
+
+import tkinter as tk
+from tkinter import ttk
+from tkinter import simpledialog
+import tkinter.font as tkfont
+import tkinter.messagebox as messagebox
+import tkinter.filedialog as filedialog
+import json
+import csv
+import datetime
+import glob
+import hashlib
+import logging
+import operator
+import os
+import time
+import uuid
+import webbrowser
+
+# 默认静默的模块日志器；需要调试输出时可自行挂载 StreamHandler
+_logger = logging.getLogger(__name__)
+_logger.addHandler(logging.NullHandler())
+
+# 导入模块化的管理器
+from settings_manager import SettingsManager, Config
+from log_manager import LogManager
+from history_manager import HistoryManager
+
+# orjson为C实现的JSON编码器，未安装时回退到标准库。
+# _dumps/_loads 统一封装两种实现：编码始终返回bytes（文件一律按二进制写），
+# 解码同时接受bytes/str，调用方不必关心装没装orjson。
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj, indent=False):
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False,
+                      indent=2 if indent else None).encode('utf-8')
+
+
+def _loads(payload):
+    if orjson is not None:
+        return orjson.loads(payload)
+    if isinstance(payload, bytes):
+        payload = payload.decode('utf-8')
+    return json.loads(payload)
+
+def setup_chinese_font_support(root, settings_manager):
+    """在已有的主窗口上检测中文字体，避免为此单独创建一个临时Tk窗口
+
+    检测结果缓存到设置文件，后续启动直接复用；仅当缓存的字体已不再
+    可用时才重新选择。
+    """
+    try:
+        import tkinter.font as tkFont
+        # frozenset把每次成员检查从O(已安装字体数)降为O(1)
+        available_fonts = frozenset(tkFont.families(root))
+
+        cached_font = settings_manager.get_chinese_font()
+        if cached_font and cached_font in available_fonts:
+            return cached_font
+
+        preferred_fonts = [
+            "Microsoft YaHei UI", "Microsoft YaHei", "SimHei", "KaiTi",
+            "FangSong", "STHeiti", "STSong", "PingFang SC", "Hiragino Sans GB",
+            "Noto Sans CJK SC", "Source Han Sans CN", "Arial Unicode MS"
+        ]
+        for font in preferred_fonts:
+            if font in available_fonts:
+                settings_manager.set_chinese_font(font)
+                return font
+        return None
+    except Exception:
+        _logger.exception("字体设置出错")
+        return None
+
+class FlowingRedFlagEvaluationSystem:
+    def __init__(self, root):
+        self.root = root
+        self.settings_manager = SettingsManager()
+
+        # 在主窗口上检测并应用中文字体（结果缓存在设置文件中）
+        self.chinese_font = setup_chinese_font_support(self.root, self.settings_manager)
+        if self.chinese_font:
+            self.root.option_add("*Font", (self.chinese_font, 9))
+
+        # 获取当前语言设置
+        # 共享字体对象：结果/关于窗口循环创建Label时不再重复解析字体元组
+        self.font_bold12 = tkfont.Font(family="微软雅黑", size=12, weight="bold")
+        self.font_regular12 = tkfont.Font(family="微软雅黑", size=12)
+        self.font_regular10 = tkfont.Font(family="微软雅黑", size=10)
+        self.font_regular9 = tkfont.Font(family="微软雅黑", size=9)
+
+        self.current_language = self.settings_manager.get_language()
+        self.root.title('流动红旗评比系统' if self.current_language == 'zh' else 'Flowing Red Flag Evaluation System')
+        self.root.geometry("1600x900")
+        
+        # 设置窗口图标
+        try:
+            # 使用新生成的ICO格式图标
+            converted_icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'converted_icon.ico')
+            if os.path.exists(converted_icon_path):
+                self.root.iconbitmap(converted_icon_path)
+            else:
+                # 回退到原始ICO格式
+                icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icon.ico')
+                self.root.iconbitmap(icon_path)
+        except Exception:
+            _logger.exception("设置窗口图标失败")
+        
+        self.log_manager = LogManager(self.settings_manager)
+        self.history_manager = HistoryManager()
+        
+        self.punishments = {}
+        # 各班级奖惩分合计、备注列表及拼接好的备注串，随奖惩增删增量维护
+        self._punish_total = {}
+        self._punish_notes = {}
+        self._punish_notes_joined = {}
+        # 增量计算缓存：每个(项目, 班级)的得分贡献以及每个班级的总分
+        # 单元格编辑时只更新受影响的班级，避免全量重算
+        self._contrib = {}
+        self._class_total = {}
+        # 延迟刷新定时器：连续编辑时合并多次排名刷新为一次
+        self._recompute_after = None
+        # 批量变更（撤销/重做/加载）后是否已安排过空闲时全量重算
+        self._recompute_pending = False
+        # 延迟快照定时器：连续奖惩编辑时合并多次历史快照为一次
+        self._snapshot_after = None
+        # 上一次历史快照的内容哈希，状态未变化时跳过入账
+        self._last_snapshot_hash = None
+        # 当前存活的单元格编辑框（同一时刻最多一个），切页时直接销毁
+        self._active_entry = None
+        # 全屏状态自己记账，切换时不用再向Tk回读窗口属性
+        self._fullscreen = False
+        # pandas较重，首次导出Excel时才导入并缓存模块引用
+        self._pandas = None
+        # 班级设置表格中现有班级名的镜像集合，查重为O(1)
+        self._class_name_set = set()
+        # 班级配置文件路径缓存，根目录变化时失效重建
+        self._class_config_path = os.path.join(
+            self.settings_manager.get_root_directory(), "class_config.json")
+        # 排名表当前显示状态，用于只更新发生变化的行
+        self._last_order = []
+        self._last_rows = {}
+        self.items = Config.ITEMS
+        self.classes = self.settings_manager.get_classes()
+        self.weighted_addition = self.settings_manager.get_weighted_addition().copy()
+        self.dual_period_items = Config.DUAL_PERIOD_ITEMS
+        # 成员检查走frozenset，热循环里的 in 判断为O(1)
+        self._dual_period_set = frozenset(self.dual_period_items)
+        self._rebuild_weight_cache()
+        
+        # 初始化class_combobox为None
+        self.class_combobox = None
+
+        # 内存中的分数存储是唯一数据源，界面表格只是它的视图
+        self._init_score_store()
+
+        self.create_main_layout()
+        self.create_menu()
+        self.create_notebook()
+        self._rebuild_page_plan()
+        self.create_sidebar()
+        self.create_status_bar()
+        self.bind_shortcuts()
+        
+        self.punishment_list_tree = None
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_change)
+        
+        self.save_snapshot()
+        self.log_manager.log("系统启动")
+        
+        self.root.after(100, self.show_welcome_message)
+    
+    def show_welcome_message(self):
+        self.update_status("🟢 系统已启动，双击表格单元格可编辑数据")
+        
+        # 检查是否是首次运行（没有保存的数据文件）
+        if not self.has_data_file():
+            self.prompt_for_data_file()
+    
+    def has_data_file(self):
+        """检查是否存在数据文件"""
+        root_dir = self.settings_manager.get_root_directory()
+        if not os.path.isdir(root_dir):
+            return False
+        # 按模式惰性匹配，找到第一个数据文件即返回，不用列出整个目录。
+        # 目录部分先转义，路径里的[]*?等字符不能被当作通配符
+        it = glob.iglob(os.path.join(glob.escape(root_dir), '流动红旗分数数据_*.json'))
+        return next(it, None) is not None
+    
+    def prompt_for_data_file(self):
+        """提示用户选择数据文件"""
+        result = messagebox.askyesno("首次运行", "检测到这是首次运行系统，是否要加载现有的数据文件？\n\n选择'是'加载数据文件，选择'否'使用默认设置。")
+        if result:
+            self.load_data()
+    
+    def _init_score_store(self):
+        """初始化内存分数存储
+
+        self.scores 按 (项目, 时段) 保存每个班级的每日分数列表，
+        self.score_avgs 保存对应的平均分。时段为 'am'/'pm'（仅双时段项目）
+        或 ''（普通项目）。所有汇总计算直接读内存，不再回读界面表格。
+        """
+        self.scores = {}
+        self.score_avgs = {}
+        for page_name in self.items:
+            max_score = self.settings_manager.get_max_score(page_name)
+            periods = ('am', 'pm') if page_name in self._dual_period_set else ('',)
+            for period in periods:
+                self.scores[(page_name, period)] = {cls: [float(max_score)] * 5 for cls in self.classes}
+                self.score_avgs[(page_name, period)] = {cls: float(max_score) for cls in self.classes}
+
+    def _sync_score_store(self):
+        """班级列表变化后把内存分数存储对齐到新列表
+
+        保留仍存在班级的已有分数，新班级按项目满分初始化，删除的
+        班级连同其分数一并移除，最后重建各页面的行显示。不同步的话
+        保存/快照路径会在新班级上查存储报KeyError。
+        """
+        for page_name in self.items:
+            max_score = float(self.settings_manager.get_max_score(page_name))
+            periods = ('am', 'pm') if page_name in self._dual_period_set else ('',)
+            for period in periods:
+                score_map = self.scores[(page_name, period)]
+                avg_map = self.score_avgs[(page_name, period)]
+                self.scores[(page_name, period)] = {
+                    cls: score_map.get(cls) or [max_score] * 5
+                    for cls in self.classes}
+                self.score_avgs[(page_name, period)] = {
+                    cls: avg_map.get(cls, max_score) for cls in self.classes}
+        self._refresh_views()
+
+    def _rebuild_page_plan(self):
+        """把项目遍历计划摊平成 (名称, 页面, 是否双时段, 满分) 元组列表
+
+        热路径（总分计算、数据复原）直接遍历该列表，避免每次循环里
+        反复做字典查找和满分查询。项目设置变化后需要重建。
+        """
+        self._page_plan = [
+            (page_name, self.pages.get(page_name),
+             page_name in self._dual_period_set,
+             self.settings_manager.get_max_score(page_name))
+            for page_name in self.items
+        ]
+
+    def _rebuild_weight_cache(self):
+        """按当前班级列表重建加权分缓存，随班级/加权设置变化调用"""
+        self._w_add = {cls: float(self.weighted_addition.get(cls, 0)) for cls in self.classes}
+
+    def _rebuild_punish_cache(self):
+        """全量重建各班级奖惩分合计（加载/撤销等整体替换奖惩数据后调用）"""
+        self._punish_total = {}
+        self._punish_notes = {}
+        self._punish_notes_joined = {}
+        for cls, punishments in self.punishments.items():
+            total = 0.0
+            notes = []
+            for punishment in punishments.values():
+                if punishment["type"] == "add":
+                    total += punishment["score"]
+                elif punishment["type"] == "subtract":
+                    total -= punishment["score"]
+                notes.append(punishment["note"])
+            self._punish_total[cls] = total
+            self._punish_notes[cls] = notes
+            self._punish_notes_joined[cls] = "\n".join(notes)
+
+    def _normalize_punishments(self, punishments):
+        """把奖惩数据规整为 {班级: {记录键: 记录}}，兼容旧版的列表格式"""
+        normalized = {}
+        for cls, records in punishments.items():
+            if isinstance(records, dict):
+                normalized[cls] = dict(records)
+            else:
+                normalized[cls] = {uuid.uuid4().hex: dict(rec) for rec in records}
+        return normalized
+
+    def _page_contrib(self, page_name, cls):
+        """某项目对某班级总分的贡献（双时段项目取上下午平均）"""
+        if page_name in self._dual_period_set:
+            am_avg = self.score_avgs[(page_name, 'am')].get(cls, 0.0)
+            pm_avg = self.score_avgs[(page_name, 'pm')].get(cls, 0.0)
+            return (am_avg + pm_avg) / 2
+        return self.score_avgs[(page_name, '')].get(cls, 0.0)
+
+    def create_main_layout(self):
+        style = ttk.Style()
+        
+        self.main_frame = ttk.Frame(self.root)
+        self.main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        self.title_frame = ttk.Frame(self.main_frame)
+        self.title_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        title_label = ttk.Label(self.title_frame, text='流动红旗评比系统', 
+                               font=("微软雅黑", 18, "bold"))
+        title_label.pack()
+        
+        # 添加分割线
+        separator = ttk.Separator(self.main_frame, orient='horizontal')
+        separator.pack(fill=tk.X, pady=(0, 10))
+        
+        self.content_frame = ttk.Frame(self.main_frame)
+        self.content_frame.pack(fill=tk.BOTH, expand=True)
+    
+    def create_menu(self):
+        menubar = tk.Menu(self.root)
+        self.root.config(menu=menubar)
+        
+        # 获取当前语言的菜单标签
+        lang = self.language_dict.get(self.current_language, self.language_dict['zh'])
+        
+        # 文件菜单 - 数据操作相关
+        file_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label=lang['file'], menu=file_menu)
+        file_menu.add_command(label=lang['save_data'], command=self.save_data, accelerator="Ctrl+S")
+        file_menu.add_command(label=lang['save_as'], command=self.save_as_data)
+        file_menu.add_command(label=lang['load_data'], command=self.load_data, accelerator="Ctrl+O")
+        file_menu.add_separator()
+        file_menu.add_command(label=lang['export_table'], command=self.save_total_score_table)
+        file_menu.add_separator()
+        file_menu.add_command(label=lang['exit'], command=self.root.quit)
+        
+        # 编辑菜单 - 数据编辑相关
+        edit_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label=lang['edit'], menu=edit_menu)
+        edit_menu.add_command(label=lang['undo'], command=self.undo_action, accelerator="Ctrl+Z")
+        edit_menu.add_command(label=lang['redo'], command=self.redo_action, accelerator="Ctrl+Y")
+        edit_menu.add_separator()
+        edit_menu.add_command(label=lang['reset_data'], command=self.reset_program)
+        
+        # 视图菜单 - 界面视图相关
+        view_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label=lang['view'], menu=view_menu)
+        view_menu.add_command(label=lang['toggle_fullscreen'], command=self.toggle_fullscreen, accelerator="F11")
+        
+        # 数据菜单 - 数据管理相关
+        data_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label=lang['data'], menu=data_menu)
+        data_menu.add_command(label=lang['manage_punishments'], command=self.manage_punishments)
+        data_menu.add_command(label=lang['history'], command=self.show_history)
+        
+        # 设置菜单 - 系统设置相关
+        settings_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label=lang['settings'], menu=settings_menu)
+        settings_menu.add_command(label=lang['system_settings'], command=self.open_settings)
+        
+        # 工具菜单 - 计算和输出相关
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label=lang['tools'], menu=tools_menu)
+        tools_menu.add_command(label=lang['calculate_total'], command=self.calculate_totals)
+        tools_menu.add_command(label=lang['output_table'], command=self.calculate_and_output_table)
+        tools_menu.add_command(label=lang['evaluation_result'], command=self.show_evaluation_result)
+        tools_menu.add_command(label=lang['export_table_alt'], command=self.save_total_score_table)
+        
+        # 帮助菜单
+        help_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label=lang['help'], menu=help_menu)
+        help_menu.add_command(label=lang['about'], command=self.show_about)
+    
+    def create_notebook(self):
+        self.left_frame = ttk.Frame(self.content_frame)
+        self.left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+        
+        self.notebook = ttk.Notebook(self.left_frame)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+
+        # 启动时只构建第一个标签页，其余标签页先放占位Frame，
+        # 首次切换到对应标签时再真正构建（见 on_tab_change）
+        self.pages = {}
+        self._lazy_pages = {}
+        # 表格 -> (项目名, 时段) 的映射，编辑提交时O(1)定位数据存储
+        self._tree_meta = {}
+        for name in self.items:
+            if not self.pages:
+                page = self.create_page(name)
+                self.pages[name] = page
+                self.notebook.add(page, text=name)
+            else:
+                stub = ttk.Frame(self.notebook)
+                self._lazy_pages[name] = stub
+                self.notebook.add(stub, text=name)
+
+    def _ensure_page_built(self, name):
+        """返回某项目的标签页，必要时先把占位Frame替换为真正的页面"""
+        page = self.pages.get(name)
+        if page is not None:
+            return page
+        stub = self._lazy_pages.pop(name)
+        page = self.create_page(name)
+        self.notebook.insert(self.notebook.index(stub), page, text=name)
+        self.notebook.forget(stub)
+        stub.destroy()
+        self.pages[name] = page
+        self._rebuild_page_plan()
+        return page
+
+    def _ensure_all_pages_built(self):
+        """全量刷新（加载/复原/导出）前先构建所有尚未展开的标签页"""
+        for name in list(self._lazy_pages):
+            self._ensure_page_built(name)
+    
+    def create_page(self, page_name):
+        frame = ttk.Frame(self.notebook)
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        item_info = self.items[page_name]
+        columns = item_info["columns"]
+
+        if page_name in self._dual_period_set:
+            am_frame = ttk.LabelFrame(frame, text=f"上午{page_name}")
+            am_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+            am_tree = self.create_tree(am_frame, columns)
+            am_tree.pack(fill=tk.BOTH, expand=True)
+            
+            pm_frame = ttk.LabelFrame(frame, text=f"下午{page_name}")
+            pm_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+            pm_tree = self.create_tree(pm_frame, columns)
+            pm_tree.pack(fill=tk.BOTH, expand=True)
+            
+            frame.am_tree = am_tree
+            frame.pm_tree = pm_tree
+            self._tree_meta[am_tree] = (page_name, 'am')
+            self._tree_meta[pm_tree] = (page_name, 'pm')
+            
+            for cls in self.classes:
+                am_tree._row_by_class[cls] = am_tree.insert(
+                    "", "end", values=self._row_values(page_name, 'am', cls))
+                pm_tree._row_by_class[cls] = pm_tree.insert(
+                    "", "end", values=self._row_values(page_name, 'pm', cls))
+        else:
+            tree = self.create_tree(frame, columns)
+            tree.pack(fill=tk.BOTH, expand=True)
+            # 直接挂在页面Frame上，取表格时不用再扫描子控件
+            frame.tree = tree
+            self._tree_meta[tree] = (page_name, '')
+
+            for cls in self.classes:
+                tree._row_by_class[cls] = tree.insert(
+                    "", "end", values=self._row_values(page_name, '', cls))
+
+        return frame
+
+    def _row_values(self, page_name, period, cls):
+        """根据内存分数存储生成某班级的一行表格显示值
+
+        标签页可能在数据加载之后才首次构建，所以行内容必须来自存储
+        而不是满分默认值。
+        """
+        day_scores = self.scores[(page_name, period)][cls]
+        avg = self.score_avgs[(page_name, period)][cls]
+        return (cls, *[f"{s:g}" for s in day_scores], f"{round(avg, 2):g}")
+    
+    def create_tree(self, parent, columns):
+        tree = ttk.Treeview(parent, columns=columns, show="headings")
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=80, anchor="center")
+
+        # 班级名称 -> 行iid 的映射，避免每次查找班级行时线性扫描整个表格
+        tree._row_by_class = {}
+
+        tree.bind("<Double-1>", lambda event, tree=tree: self.on_double_click(event, tree))
+        return tree
+    
+    def create_sidebar(self):
+        self.right_frame = ttk.Frame(self.content_frame)
+        self.right_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=(5, 0))
+        
+        self.total_frame = ttk.LabelFrame(self.right_frame, text="🏆 总分排名", padding=10)
+        self.total_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        tree_container = ttk.Frame(self.total_frame)
+        tree_container.pack(fill=tk.BOTH, expand=True)
+        
+        self.total_tree = ttk.Treeview(tree_container, columns=("排名", "班级", "总分"), show="headings", height=12)
+        self.total_tree.heading("排名", text="排名")
+        self.total_tree.heading("班级", text="班级")
+        self.total_tree.heading("总分", text="总分")
+        self.total_tree.column("排名", width=40, anchor="center")
+        self.total_tree.column("班级", width=90, anchor="center")
+        self.total_tree.column("总分", width=70, anchor="center")
+        
+        tree_scrollbar = ttk.Scrollbar(tree_container, orient=tk.VERTICAL, command=self.total_tree.yview)
+        self.total_tree.configure(yscrollcommand=tree_scrollbar.set)
+        
+        self.total_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.total_tree.tag_configure("first_place", background="#FFD700", foreground="black")
+        self.total_tree.tag_configure("top_five", background="#87CEEB", foreground="black")
+        self.total_tree.tag_configure("normal", background="white", foreground="black")
+        
+        self.action_frame = ttk.LabelFrame(self.right_frame, text="🛠️ 操作面板", padding=10)
+        self.action_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        # 所有操作按钮排布在同一个 3×2 网格中，减少嵌套 Frame 的布局开销
+        self._build_action_grid(self.action_frame, [
+            ("📊 计算/刷新", self.calculate_totals),
+            ("📋 输出表格", self.calculate_and_output_table),
+            ("⚖️ 奖惩管理", self.manage_punishments),
+            ("🔄 复原数据", self.reset_program),
+            ("🏆 评比结果", self.show_evaluation_result),
+            ("💾 导出表格", self.save_total_score_table),
+        ])
+    
+    def _build_action_grid(self, parent, buttons):
+        for i, (text, command) in enumerate(buttons):
+            btn = ttk.Button(parent, text=text, command=command)
+            btn.grid(row=i // 2, column=i % 2, sticky="ew", padx=3, pady=2)
+        parent.columnconfigure((0, 1), weight=1)
+    
+    def create_status_bar(self):
+        self.status_frame = ttk.Frame(self.root, relief=tk.RAISED, borderwidth=1)
+        self.status_frame.pack(fill=tk.X, side=tk.BOTTOM, padx=5, pady=5)
+        
+        self.status_icon = ttk.Label(self.status_frame, text="🟢", anchor=tk.W, width=3, font=("微软雅黑", 10), background="#e8f4f8")
+        self.status_icon.pack(side=tk.LEFT, padx=(5, 10))
+        
+        self.status_bar = ttk.Label(self.status_frame, text="系统就绪", relief=tk.FLAT, anchor=tk.W, 
+                                   font=("微软雅黑", 9), foreground="blue", background="#e8f4f8")
+        self.status_bar.pack(fill=tk.X, side=tk.LEFT, expand=True, padx=(0, 10))
+        
+        self.tip_label = ttk.Label(self.status_frame, text="提示: 双击表格可编辑数据 | Ctrl+T: 输出表格 | Ctrl+P: 惩罚管理 | Ctrl+R: 复原数据", 
+                                  relief=tk.FLAT, anchor=tk.CENTER, foreground="gray", 
+                                  font=("微软雅黑", 8), background="#e8f4f8")
+        self.tip_label.pack(side=tk.LEFT, padx=(10, 10))
+        
+        self.time_label = ttk.Label(self.status_frame, text="", relief=tk.FLAT, anchor=tk.E, 
+                                   font=("微软雅黑", 9), foreground="darkgreen", background="#e8f4f8")
+        self.time_label.pack(fill=tk.X, side=tk.RIGHT, expand=True, padx=(10, 5))
+        self.update_time()
+    
+    def update_time(self):
+        if self.root.winfo_exists():
+            # 窗口没有焦点时跳过时间标签重绘，只保留定时器
+            if self.root.focus_displayof() is not None:
+                # time.strftime 不需要构造 datetime 对象，秒级时钟足够
+                self.time_label.config(text=time.strftime("%Y-%m-%d %H:%M:%S"))
+            self.time_after_id = self.root.after(1000, self.update_time)
+    
+    def on_double_click(self, event, tree):
+        region = tree.identify_region(event.x, event.y)
+        if region == "cell":
+            item = tree.identify_row(event.y)
+            column = tree.identify_column(event.x)
+            
+            # 不允许编辑第一列（班级名称）
+            if column == "#1":
+                return
+            
+            # 列号只解析一次，后续直接传下标
+            col_index = int(column[1]) - 1
+            current_value = tree.item(item, "values")[col_index]
+            
+            # 如果点击的是平均分列（第7列），添加确认提示
+            if col_index == 6:  # 第7列是平均分列
+                if not messagebox.askyesno("确认更改", "你确认要进行更改吗？这是平均分"):
+                    return
+            
+            bbox = tree.bbox(item, column)
+            if not bbox:
+                return
+            
+            x, y, width, height = bbox
+            
+            entry = ttk.Entry(tree, justify='center', font=self.font_regular9)
+            entry.place(x=x, y=y, width=width, height=height)
+            entry.insert(0, current_value)
+            entry.select_range(0, tk.END)
+            
+            # 登记当前编辑框；销毁（含回车/Esc里的destroy）时自动注销
+            self._active_entry = entry
+            entry.bind("<Destroy>", lambda e, entry=entry: self._on_entry_destroyed(entry))
+            
+            entry.bind("<Return>", lambda e, item=item, col_index=col_index, tree=tree, entry=entry: 
+                       self.on_enter(e, item, col_index, tree, entry))
+            entry.bind("<Escape>", lambda e, entry=entry: self.on_escape(e, entry))
+            entry.bind("<FocusOut>", lambda e, item=item, col_index=col_index, tree=tree, entry=entry: 
+                       self.on_focus_out(e, item, col_index, tree, entry))
+            entry.focus_set()
+            
+            try:
+                values = list(tree.item(item, "values"))
+                self.update_status(f"正在编辑: {values[0]} 班级 {column} 项目")
+            except Exception as e:
+                self.update_status(f"编辑项目时出错: {str(e)}")
+    
+    def on_enter(self, event, item, col_index, tree, entry):
+        new_value = entry.get()
+        try:
+            page_name, period = self._tree_meta[tree]
+
+            score = float(new_value)
+            max_score = self.settings_manager.get_max_score(page_name)
+            if score < 0 or score > max_score:
+                messagebox.showerror("输入错误", f"分数应在0-{max_score}之间！\n\n您输入的值: {new_value}")
+                self.update_status(f"输入错误: 分数应在0-{max_score}之间")
+                entry.destroy()
+                return
+        except ValueError:
+            messagebox.showerror("输入错误", f"请输入有效的数字！\n\n您输入的值: {new_value}")
+            self.update_status("输入错误: 请输入有效的数字")
+            entry.destroy()
+            return
+        
+        try:
+            values = list(tree.item(item, "values"))
+            cls = values[0]
+
+            values[col_index] = new_value
+
+            # 写入内存存储；编辑1-5列时自动重算平均分。
+            # 平均分用"百分之一"定点整数计算并格式化，
+            # 避免热路径上的浮点 round() 和字符串化开销
+            if 1 <= col_index <= 5:
+                day_scores = self.scores[(page_name, period)][cls]
+                day_scores[col_index - 1] = score
+                total_cents = sum(int(s * 100 + 0.5) for s in day_scores)
+                avg_cents = (total_cents + 2) // 5
+                self.score_avgs[(page_name, period)][cls] = avg_cents / 100
+                values[6] = f"{avg_cents // 100}.{avg_cents % 100:02d}"
+            elif col_index == 6:
+                self.score_avgs[(page_name, period)][cls] = score
+
+            tree.item(item, values=values)
+            
+            self.save_snapshot()
+            
+            entry.destroy()
+            self.update_status(f"已更新 {values[0]} 班级的分数")
+            self.log_manager.log(f"更新 {values[0]} 班级 {page_name} 项目分数为 {new_value}")
+            self._recompute_incremental(page_name, values[0])
+        except Exception as e:
+            self.update_status(f"更新分数时出错: {str(e)}")
+            entry.destroy()
+    
+    def on_escape(self, event, entry):
+        entry.destroy()
+    
+    def on_focus_out(self, event, item, col_index, tree, entry):
+        # 当输入框失去焦点时，自动保存更改
+        self.on_enter(event, item, col_index, tree, entry)
+    
+    def update_status(self, message):
+        self.status_bar.config(text=message)
+        self.root.after(3000, lambda: self.status_bar.config(text="就绪"))
+    
+    def bind_shortcuts(self):
+        self.root.bind('<Control-s>', lambda e: self.save_data())
+        self.root.bind('<Control-o>', lambda e: self.load_data())
+        self.root.bind('<Control-t>', lambda e: self.calculate_and_output_table())
+        self.root.bind('<Control-p>', lambda e: self.manage_punishments())
+        self.root.bind('<Control-r>', lambda e: self.reset_program())
+        self.root.bind('<Control-e>', lambda e: self.save_total_score_table())
+        self.root.bind('<Control-z>', lambda e: self.undo_action())
+        self.root.bind('<Control-y>', lambda e: self.redo_action())
+        self.root.bind('<F5>', lambda e: self.calculate_totals())
+        self.root.bind('<F6>', lambda e: self.show_evaluation_result())
+        self.root.bind('<F11>', lambda e: self.toggle_fullscreen())
+    
+    def reset_program(self):
+        if messagebox.askyesno("确认", "确定要复原所有数据吗？"):
+            self.save_snapshot()
+            
+            self.reset_data()
+            self.punishments.clear()
+            self._punish_total.clear()
+            self._punish_notes.clear()
+            self._punish_notes_joined.clear()
+            self.update_status("数据已复原")
+            self.log_manager.log("执行数据复原操作")
+    
+    def reset_data(self):
+        self.classes = self.settings_manager.get_classes()
+        self._init_score_store()
+        self._ensure_all_pages_built()
+
+        for page_name, page_frame, is_dual, max_score in self._page_plan:
+            if is_dual:
+                self.reset_tree_data(page_frame.am_tree, max_score)
+                self.reset_tree_data(page_frame.pm_tree, max_score)
+            else:
+                self.reset_tree_data(page_frame.tree, max_score)
+        
+        # 一次delete调用清空整个表格，免去每行一次Tcl往返
+        children = self.total_tree.get_children()
+        if children:
+            self.total_tree.delete(*children)
+        self._last_order = []
+        self._last_rows.clear()
+        # 增量缓存一并作废，否则复原后的首次编辑会走快速路径，
+        # 用复原前的旧总分刷新排名
+        self._contrib.clear()
+        self._class_total.clear()
+        self.schedule_recompute()
+
+        self.punishments.clear()
+        self._punish_total.clear()
+        self._punish_notes.clear()
+        self._punish_notes_joined.clear()
+        # 检查punishment_list_tree组件是否仍然有效
+        if hasattr(self, 'punishment_list_tree') and self.punishment_list_tree is not None:
+            children = self.punishment_list_tree.get_children()
+            if children:
+                self.punishment_list_tree.delete(*children)
+    
+    def reset_tree_data(self, tree, max_score):
+        if isinstance(tree, ttk.Treeview):
+            # 禁用界面刷新以提高性能
+            tree.config(selectmode='none')
+
+            for cls, item in tree._row_by_class.items():
+                values = list(tree.item(item, "values"))
+                for i in range(1, 6):
+                    values[i] = max_score
+                values[6] = max_score
+                tree.item(item, values=values)
+
+            # 恢复界面刷新
+            tree.config(selectmode='browse')
+    
+    def calculate_totals(self):
+        # 全量重算：重建增量缓存（加载/复原等批量变更后调用）
+        self._contrib.clear()
+        self._class_total.clear()
+
+        for cls in self.classes:
+            total_score = 0
+            for page_name, _frame, is_dual, _max_score in self._page_plan:
+                # 直接读内存存储，不再回读界面表格
+                if is_dual:
+                    contrib = (self.score_avgs[(page_name, 'am')].get(cls, 0.0)
+                               + self.score_avgs[(page_name, 'pm')].get(cls, 0.0)) / 2
+                else:
+                    contrib = self.score_avgs[(page_name, '')].get(cls, 0.0)
+                self._contrib[(page_name, cls)] = contrib
+                total_score += contrib
+
+            # 加权分数 + 奖惩分数（合计随奖惩增删增量维护）
+            total_score += self._w_add.get(cls, 0.0)
+            total_score += self._punish_total.get(cls, 0.0)
+
+            self._class_total[cls] = total_score
+
+        self._refresh_total_tree()
+
+        self.log_manager.log("执行总分计算")
+
+    def _recompute_incremental(self, page_name, cls):
+        """单元格编辑后的快速路径：只更新受影响的(项目, 班级)贡献"""
+        if (page_name, cls) not in self._contrib:
+            # 缓存尚未建立（如首次编辑前未全量计算），退回全量重算
+            self.calculate_totals()
+            return
+
+        new_contrib = self._page_contrib(page_name, cls)
+        old_contrib = self._contrib[(page_name, cls)]
+        self._contrib[(page_name, cls)] = new_contrib
+        self._class_total[cls] += (new_contrib - old_contrib)
+        self._schedule_recompute()
+
+    def _schedule_recompute(self):
+        """合并短时间内的多次排名刷新请求（如连续Tab编辑多个单元格）"""
+        if self._recompute_after is not None:
+            self.root.after_cancel(self._recompute_after)
+        self._recompute_after = self.root.after(150, self._do_recompute)
+
+    def _do_recompute(self):
+        self._recompute_after = None
+        self._refresh_total_tree()
+
+    def schedule_recompute(self):
+        """批量变更（撤销/重做/加载历史）后安排一次空闲时全量重算
+
+        同一次事件处理里可能连续触发多处变更，这里只登记一个
+        after_idle回调，回到事件循环空闲时执行一次calculate_totals()。
+        与_schedule_recompute（单元格编辑后的排名刷新去抖）不同，
+        这条路径会重建全部增量缓存。
+        """
+        if self._recompute_pending:
+            return
+        self._recompute_pending = True
+        self.root.after_idle(self._do_full_recompute)
+
+    def _do_full_recompute(self):
+        self._recompute_pending = False
+        self.calculate_totals()
+
+    def schedule_snapshot(self):
+        """合并短时间内的多次快照请求（如连续添加多条奖惩），只序列化一次"""
+        if self._snapshot_after is not None:
+            self.root.after_cancel(self._snapshot_after)
+        self._snapshot_after = self.root.after(300, self._do_snapshot)
+
+    def _do_snapshot(self):
+        self._snapshot_after = None
+        self.save_snapshot()
+
+    def _refresh_total_tree(self):
+        # 排序班级分数（itemgetter 走C实现，免去每个元素一次Python函数调用）
+        sorted_classes = sorted(self._class_total.items(),
+                                key=operator.itemgetter(1), reverse=True)
+        new_order = [cls for cls, _ in sorted_classes]
+
+        if set(new_order) != set(self._last_order):
+            # 班级集合变化（加载/班级管理后）：整表重建，行iid直接用班级名
+            self.total_tree.config(selectmode='none')
+            children = self.total_tree.get_children()
+            if children:
+                self.total_tree.delete(*children)
+            self._last_rows.clear()
+            for i, (cls, score) in enumerate(sorted_classes):
+                tag = "first_place" if i == 0 else ("top_five" if i < 5 else "normal")
+                row = (i + 1, cls, round(score, 2))
+                self.total_tree.insert("", "end", iid=cls, values=row, tags=(tag,))
+                self._last_rows[cls] = (row, tag)
+            self.total_tree.config(selectmode='browse')
+            self._last_order = new_order
+            return
+
+        # 班级集合未变：只移动/更新排名或分数发生变化的行
+        for i, (cls, score) in enumerate(sorted_classes):
+            tag = "first_place" if i == 0 else ("top_five" if i < 5 else "normal")
+            row = (i + 1, cls, round(score, 2))
+            if i >= len(self._last_order) or self._last_order[i] != cls:
+                self.total_tree.move(cls, "", i)
+            if self._last_rows.get(cls) != (row, tag):
+                self.total_tree.item(cls, values=row, tags=(tag,))
+                self._last_rows[cls] = (row, tag)
+        self._last_order = new_order
+    
+    def get_class_average(self, tree, cls):
+        """读取某班级在某表格上的平均分
+
+        平均分由 score_avgs 缓存，单元格提交时就地更新，天然具备
+        "编辑即失效"的语义，这里只剩一次字典查找。
+        """
+        meta = self._tree_meta.get(tree)
+        if meta is not None:
+            return self.score_avgs[meta].get(cls, 0.0)
+        # 兜底：未登记元数据的表格按行iid直接取值
+        iid = getattr(tree, '_row_by_class', {}).get(cls)
+        return float(tree.item(iid, "values")[6]) if iid else 0.0
+    
+    def calculate_and_output_table(self):
+        self.calculate_totals()
+        self.show_output_table()
+    
+    def show_output_table(self):
+        output_window = tk.Toplevel(self.root)
+        output_window.title("流动红旗评比总分表")
+        output_window.geometry("1200x600")
+        output_window.transient(self.root)
+        
+        columns = ("班级", "早迟到", "早读", "节能开窗", "仪容仪表", "间操", "午休", "上下午各班卫生", "巡视", "及时上交文件", "宿舍", "加权", "奖惩分", "奖惩备注", "总分")
+        tree = ttk.Treeview(output_window, columns=columns, show="headings")
+        
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=80)
+        
+        # 每个项目先从内存存储取出 {班级: 平均分}，班级循环里只剩字典查找；
+        # 旧实现用 (项目, 班级, 时段) 元组去查 get_all_scores 返回的按项目
+        # 字典，永远只能取到默认值0，这里一并修正
+        page_avgs = {}
+        for page_name in self.items:
+            if page_name in self._dual_period_set:
+                am = self.score_avgs[(page_name, 'am')]
+                pm = self.score_avgs[(page_name, 'pm')]
+                page_avgs[page_name] = {
+                    cls: (am.get(cls, 0.0) + pm.get(cls, 0.0)) / 2
+                    for cls in self.classes
+                }
+            else:
+                page_avgs[page_name] = self.score_avgs[(page_name, '')]
+        
+        # 先在Python侧把所有行拼好，表格挂载(pack)前一次性插入，
+        # 避免每行insert都触发一次已显示表格的重绘
+        rows = []
+        for cls in self.classes:
+            # 行内保留原始浮点，入表时统一格式化，热循环里不再逐列round()
+            numbers = []
+            subtotal = 0.0
+            for page_name in self.items:
+                avg_score = page_avgs[page_name].get(cls, 0.0)
+                subtotal += avg_score
+                numbers.append(avg_score)
+            weighted = self.weighted_addition.get(cls, 0)
+            numbers.append(weighted)
+            # 奖惩合计与备注都读增量维护的缓存，不再逐条扫描奖惩记录
+            punishment_score = self._punish_total.get(cls, 0)
+            numbers.append(punishment_score)
+            total_score = subtotal + weighted + punishment_score
+            notes = self._punish_notes_joined.get(cls, "")
+            rows.append((cls, numbers, notes, total_score))
+        
+        insert = tree.insert
+        for cls, numbers, notes, total_score in rows:
+            # 班级名唯一，直接作为行iid，省去Tk内部的iid生成
+            insert("", "end", iid=cls, values=(
+                cls, *[f"{v:.2f}" for v in numbers], notes, f"{total_score:.2f}"))
+        
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        v_scrollbar = ttk.Scrollbar(output_window, orient=tk.VERTICAL, command=tree.yview)
+        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.configure(yscrollcommand=v_scrollbar.set)
+        
+        h_scrollbar = ttk.Scrollbar(output_window, orient=tk.HORIZONTAL, command=tree.xview)
+        h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        tree.configure(xscrollcommand=h_scrollbar.set)
+    
+    def show_evaluation_result(self):
+        self.calculate_totals()
+        
+        # 直接消费计算缓存里的权威总分，不再逐行读回排名表再解析float
+        class_scores = {cls: round(total, 2)
+                        for cls, total in self._class_total.items()}
+        
+        sorted_classes = sorted(class_scores.items(),
+                                key=operator.itemgetter(1), reverse=True)
+        
+        result_window = tk.Toplevel(self.root)
+        result_window.title("流动红旗评比结果")
+        result_window.geometry("600x400")
+        result_window.transient(self.root)
+        
+        main_frame = ttk.Frame(result_window)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        title_label = ttk.Label(main_frame, text="流动红旗评比结果", font=("微软雅黑", 16, "bold"))
+        title_label.pack(pady=(0, 20))
+        
+        result_frame = ttk.Frame(main_frame)
+        result_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 创建按钮框架
+        button_frame = ttk.Frame(result_frame)
+        button_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        # 添加显示图表按钮
+        show_chart_button = ttk.Button(button_frame, text="显示统计图表", command=lambda: self.show_evaluation_chart(class_scores))
+        show_chart_button.pack(side=tk.RIGHT)
+        
+        ttk.Label(result_frame, text="校级流动红旗获得者：", font=self.font_bold12).pack(anchor=tk.W, pady=(0, 10))
+        ttk.Label(result_frame, text=f"{sorted_classes[0][0]}（总分：{sorted_classes[0][1]}）", font=self.font_regular12).pack(anchor=tk.W)
+        
+        ttk.Label(result_frame, text="年级流动红旗获得者：", font=self.font_bold12).pack(anchor=tk.W, pady=(20, 10))
+        for i in range(1, min(5, len(sorted_classes))):
+            ttk.Label(result_frame, text=f"{sorted_classes[i][0]}（总分：{sorted_classes[i][1]}）", font=self.font_regular12).pack(anchor=tk.W)
+    
+    def manage_punishments(self):
+        # 使用局部变量而不是实例变量来避免组件引用问题
+        local_vars = {}
+        
+        punishment_window = tk.Toplevel(self.root)
+        punishment_window.title("奖惩管理")
+        punishment_window.geometry("800x500")
+        punishment_window.transient(self.root)
+        punishment_window.grab_set()
+        
+        main_frame = ttk.Frame(punishment_window)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        input_frame = ttk.LabelFrame(main_frame, text="添加奖惩")
+        input_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        input_frame.grid_columnconfigure(1, weight=1)
+        
+        ttk.Label(input_frame, text="选择班级:").grid(row=0, column=0, padx=10, pady=10, sticky="e")
+        # 使用局部变量存储组件引用
+        local_vars['class_combobox'] = ttk.Combobox(input_frame, values=self.classes)
+        local_vars['class_combobox'].grid(row=0, column=1, padx=10, pady=10, sticky="ew")
+        
+        ttk.Label(input_frame, text="奖惩类型:").grid(row=1, column=0, padx=10, pady=10, sticky="e")
+        local_vars['punishment_type'] = tk.StringVar()
+        type_frame = ttk.Frame(input_frame)
+        type_frame.grid(row=1, column=1, padx=10, pady=10, sticky="w")
+        ttk.Radiobutton(type_frame, text="奖励（加分）", variable=local_vars['punishment_type'], value="add").pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(type_frame, text="惩罚（减分）", variable=local_vars['punishment_type'], value="subtract").pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(input_frame, text="分值:").grid(row=2, column=0, padx=10, pady=10, sticky="e")
+        local_vars['score_entry'] = ttk.Entry(input_frame)
+        local_vars['score_entry'].grid(row=2, column=1, padx=10, pady=10, sticky="ew")
+        
+        ttk.Label(input_frame, text="备注:").grid(row=3, column=0, padx=10, pady=10, sticky="e")
+        local_vars['note_entry'] = ttk.Entry(input_frame)
+        local_vars['note_entry'].grid(row=3, column=1, padx=10, pady=10, sticky="ew")
+        
+        button_frame = ttk.Frame(input_frame)
+        button_frame.grid(row=4, column=0, columnspan=2, pady=10)
+        
+        # 定义局部的添加和删除方法
+        def add_punishment_local():
+            cls = local_vars['class_combobox'].get()
+            if not cls:
+                messagebox.showerror("错误", "请选择班级！")
+                return
+            ptype = local_vars['punishment_type'].get()
+            if not ptype:
+                messagebox.showerror("错误", "请选择奖惩类型！")
+                return
+            score = local_vars['score_entry'].get()
+            try:
+                score = float(score)
+            except ValueError:
+                messagebox.showerror("错误", "请输入有效的分值！")
+                return
+            note = local_vars['note_entry'].get()
+            if not note:
+                messagebox.showerror("错误", "请输入备注！")
+                return
+            
+            # 记录键同时用作表格行iid，删除时可以直接定位
+            uid = uuid.uuid4().hex
+            self.punishments.setdefault(cls, {})[uid] = {"type": ptype, "score": score, "note": note}
+            delta = score if ptype == "add" else -score
+            self._punish_total[cls] = self._punish_total.get(cls, 0.0) + delta
+            notes = self._punish_notes.setdefault(cls, [])
+            notes.append(note)
+            self._punish_notes_joined[cls] = "\n".join(notes)
+            
+            type_text = "奖励" if ptype == "add" else "惩罚"
+            local_vars['punishment_records'].append((uid, (cls, type_text, score, note)))
+            local_vars['render_window']()
+            
+            self.schedule_snapshot()
+            
+            local_vars['score_entry'].delete(0, tk.END)
+            local_vars['note_entry'].delete(0, tk.END)
+            self.update_status(f"已为 {cls} 添加奖惩")
+            self.log_manager.log(f"为 {cls} 添加{ptype}分 {score}，备注: {note}")
+        
+        def delete_punishment_local():
+            selected_item = local_vars['punishment_list_tree'].selection()
+            if not selected_item:
+                messagebox.showerror("错误", "请选择要删除的奖惩！")
+                return
+            
+            uid = selected_item[0]
+            values = local_vars['punishment_list_tree'].item(uid, "values")
+            cls = values[0]
+            
+            # 行iid就是记录键，直接pop，不再逐条比对类型/分值/备注
+            punishment = self.punishments.get(cls, {}).pop(uid, None)
+            if punishment is None:
+                return
+            score = punishment["score"]
+            note = punishment["note"]
+            delta = score if punishment["type"] == "add" else -score
+            self._punish_total[cls] = self._punish_total.get(cls, 0.0) - delta
+            notes = self._punish_notes.get(cls)
+            if notes and note in notes:
+                notes.remove(note)
+                self._punish_notes_joined[cls] = "\n".join(notes)
+            records = local_vars['punishment_records']
+            records[:] = [r for r in records if r[0] != uid]
+            local_vars['render_window']()
+            
+            self.schedule_snapshot()
+            
+            self.update_status(f"已删除 {cls} 的奖惩记录")
+            self.log_manager.log(f"删除 {cls} 的奖惩记录: {values[1]}分 {score}，备注: {note}")
+        
+        add_button = ttk.Button(button_frame, text="添加奖惩", command=add_punishment_local)
+        add_button.pack(side=tk.LEFT, padx=5)
+        delete_button = ttk.Button(button_frame, text="删除奖惩", command=delete_punishment_local)
+        delete_button.pack(side=tk.LEFT, padx=5)
+        
+        list_frame = ttk.LabelFrame(main_frame, text="当前奖惩列表")
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 创建Treeview和滚动条
+        tree_frame = ttk.Frame(list_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        columns = ("班级", "类型", "分值", "备注")
+        local_vars['punishment_list_tree'] = ttk.Treeview(tree_frame, columns=columns, show="headings")
+        for col in columns:
+            local_vars['punishment_list_tree'].heading(col, text=col)
+            local_vars['punishment_list_tree'].column(col, width=150)
+        
+        # 使用grid布局确保滚动条正确显示
+        local_vars['punishment_list_tree'].grid(row=0, column=0, sticky='nsew')
+        
+        # 配置grid权重
+        tree_frame.grid_rowconfigure(0, weight=1)
+        tree_frame.grid_columnconfigure(0, weight=1)
+        
+        # 虚拟化填充：全部记录保存在Python列表里，表格只插入可视窗口内的
+        # 行，滚动时按偏移重建窗口，填充成本与记录总数无关
+        records = [
+            (uid, (cls, "奖励" if punishment["type"] == "add" else "惩罚",
+                   punishment["score"], punishment["note"]))
+            for cls, punishments in self.punishments.items()
+            for uid, punishment in punishments.items()
+        ]
+        local_vars['punishment_records'] = records
+        visible_rows = 15  # 窗口几何固定为800x500，可视行数基本不变
+        state = {'top': 0}
+        
+        def render_window():
+            tree = local_vars['punishment_list_tree']
+            tree.delete(*tree.get_children())
+            top = min(state['top'], max(len(records) - visible_rows, 0))
+            state['top'] = top
+            for uid, values in records[top:top + visible_rows]:
+                tree.insert("", "end", iid=uid, values=values)
+            total = max(len(records), 1)
+            scrollbar.set(top / total, min((top + visible_rows) / total, 1.0))
+        
+        local_vars['render_window'] = render_window
+        
+        def on_scrollbar(action, value, units=None):
+            total = len(records)
+            if total <= visible_rows:
+                return
+            if action == "moveto":
+                top = int(float(value) * total)
+            else:
+                top = state['top'] + int(value) * (visible_rows if units == "pages" else 1)
+            state['top'] = max(0, min(top, total - visible_rows))
+            render_window()
+        
+        def on_mousewheel(event):
+            on_scrollbar("scroll", 1 if event.delta < 0 else -1, "units")
+            return "break"
+        
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=on_scrollbar)
+        scrollbar.grid(row=0, column=1, sticky='ns')
+        local_vars['punishment_list_tree'].bind("<MouseWheel>", on_mousewheel)
+        local_vars['punishment_list_tree'].bind(
+            "<Button-4>", lambda e: on_scrollbar("scroll", -1, "units"))
+        local_vars['punishment_list_tree'].bind(
+            "<Button-5>", lambda e: on_scrollbar("scroll", 1, "units"))
+        
+        # 首次填充推迟到窗口绘制完成之后，对话框先出现再补数据
+        self.root.after_idle(render_window)
+        
+        # 窗口关闭时不需要清理引用，因为使用的是局部变量
+        def on_closing():
+            punishment_window.destroy()
+        
+        punishment_window.protocol("WM_DELETE_WINDOW", on_closing)
+
+
+    
+
+    
+    def open_settings(self):
+        settings_window = tk.Toplevel(self.root)
+        settings_window.title("系统设置")
+        settings_window.geometry("400x300")
+        settings_window.transient(self.root)
+        
+        main_frame = ttk.Frame(settings_window)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        ttk.Button(main_frame, text="根目录设置", command=self.open_directory_settings, width=20).pack(pady=10)
+        ttk.Button(main_frame, text="文件路径信息", command=self.open_file_info, width=20).pack(pady=10)
+        ttk.Button(main_frame, text="项目分数设置", command=self.open_score_settings, width=20).pack(pady=10)
+        ttk.Button(main_frame, text="班级管理", command=self.open_class_settings, width=20).pack(pady=10)
+        
+        ttk.Button(main_frame, text="关于", command=self.show_about, width=20).pack(pady=10)
+    
+    def show_evaluation_chart(self, class_scores):
+        """显示评比结果的统计图表"""
+        try:
+            import matplotlib.pyplot as plt
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            
+            # 创建新窗口
+            chart_window = tk.Toplevel(self.root)
+            chart_window.title("评比结果统计图表")
+            chart_window.geometry("800x600")
+            chart_window.transient(self.root)
+            
+            # 创建图表
+            fig, ax = plt.subplots(figsize=(10, 6))
+            
+            # 准备数据
+            classes = list(class_scores.keys())
+            scores = list(class_scores.values())
+            
+            # 创建柱状图
+            bars = ax.bar(classes, scores, color='skyblue')
+            
+            # 设置图表标题和标签
+            ax.set_title('流动红旗评比结果', fontsize=16, fontweight='bold')
+            ax.set_xlabel('班级', fontsize=12)
+            ax.set_ylabel('总分', fontsize=12)
+            
+            # 旋转x轴标签以避免重叠
+            plt.setp(ax.get_xticklabels(), rotation=45, ha="right", rotation_mode="anchor")
+            
+            # 在每个柱子上显示数值
+            for bar in bars:
+                height = bar.get_height()
+                ax.annotate(f'{height:.2f}',
+                            xy=(bar.get_x() + bar.get_width() / 2, height),
+                            xytext=(0, 3),  # 3 points vertical offset
+                            textcoords="offset points",
+                            ha='center', va='bottom')
+            
+            # 调整布局
+            plt.tight_layout()
+            
+            # 将图表嵌入到Tkinter窗口中
+            canvas = FigureCanvasTkAgg(fig, master=chart_window)
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            
+        except ImportError:
+            messagebox.showerror("错误", "未安装matplotlib库，无法显示图表\n请运行: pip install matplotlib")
+        except Exception as e:
+            messagebox.showerror("错误", f"显示图表时出错：{str(e)}")
+
+    def open_directory_settings(self):
+        dir_window = tk.Toplevel(self.root)
+        dir_window.title("根目录设置")
+        dir_window.geometry("500x200")
+        dir_window.transient(self.root)
+        
+        main_frame = ttk.Frame(dir_window)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        ttk.Label(main_frame, text="当前根目录:").pack(anchor=tk.W)
+        current_dir_label = ttk.Label(main_frame, text=self.settings_manager.get_root_directory(), 
+                                     wraplength=400, justify=tk.LEFT)
+        current_dir_label.pack(fill=tk.X, pady=(5, 10))
+        
+        def choose_directory():
+            directory = filedialog.askdirectory(initialdir=self.settings_manager.get_root_directory())
+            if directory:
+                self.settings_manager.set_root_directory(directory)
+                current_dir_label.config(text=directory)
+                # 依赖根目录的路径缓存随之失效
+                self._class_config_path = os.path.join(directory, "class_config.json")
+                # 日志文件路径随根目录变化，重新打开日志
+                self.log_manager.rotate()
+                self.log_manager.log(f"更改根目录为: {directory}")
+                messagebox.showinfo("设置", "根目录已更新")
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=10)
+        
+        ttk.Button(button_frame, text="选择根目录", command=choose_directory).pack(side=tk.LEFT)
+
+    def open_file_info(self):
+        info_window = tk.Toplevel(self.root)
+        info_window.title("文件路径信息")
+        info_window.geometry("500x150")
+        info_window.transient(self.root)
+        
+        main_frame = ttk.Frame(info_window)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        ttk.Label(main_frame, text="数据文件路径:").pack(anchor=tk.W)
+        data_file_label = ttk.Label(main_frame, text=self.settings_manager.get_data_file_path(), 
+                                   wraplength=400, justify=tk.LEFT, foreground="blue")
+        data_file_label.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(main_frame, text="日志文件路径:").pack(anchor=tk.W)
+        log_file_label = ttk.Label(main_frame, text=self.settings_manager.get_log_file_path(), 
+                                  wraplength=400, justify=tk.LEFT, foreground="blue")
+        log_file_label.pack(fill=tk.X)
+
+    def open_score_settings(self):
+        scores_window = tk.Toplevel(self.root)
+        scores_window.title("项目分数设置")
+        scores_window.geometry("600x500")
+        scores_window.transient(self.root)
+        
+        main_frame = ttk.Frame(scores_window)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        # 用单个Treeview替代 Canvas+Frame+每项一组Label/Entry 的滚动容器，
+        # 每个项目只剩一行表格数据，滚动由Treeview原生处理
+        columns = ("项目", "分值")
+        score_tree = ttk.Treeview(main_frame, columns=columns, show="headings", height=12)
+        for col in columns:
+            score_tree.heading(col, text=col)
+            score_tree.column(col, width=200, anchor="center")
+        
+        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=score_tree.yview)
+        score_tree.configure(yscrollcommand=scrollbar.set)
+        
+        score_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        for item_name in self.items:
+            max_score = self.settings_manager.get_max_score(item_name)
+            score_tree.insert("", "end", iid=item_name, values=(item_name, f"{max_score:g}"))
+        
+        def on_score_double_click(event):
+            item = score_tree.identify_row(event.y)
+            if not item:
+                return
+            current_value = score_tree.item(item, "values")[1]
+            
+            edit_window = tk.Toplevel(score_tree)
+            edit_window.title("编辑")
+            edit_window.geometry("300x100")
+            edit_window.transient(score_tree)
+            edit_window.grab_set()
+            
+            # 居中显示
+            edit_window.geometry("+{}+{}".format(
+                edit_window.winfo_screenwidth() // 2 - 150,
+                edit_window.winfo_screenheight() // 2 - 50
+            ))
+            
+            ttk.Label(edit_window, text=f"请输入 {item} 的分值:").pack(pady=5)
+            entry_var = tk.StringVar(value=current_value)
+            entry = ttk.Entry(edit_window, textvariable=entry_var, width=30)
+            entry.pack(pady=5)
+            entry.select_range(0, tk.END)
+            entry.focus()
+            
+            def save_edit():
+                score_tree.item(item, values=(item, entry_var.get()))
+                edit_window.destroy()
+            
+            button_frame = ttk.Frame(edit_window)
+            button_frame.pack(pady=5)
+            ttk.Button(button_frame, text="保存", command=save_edit).pack(side=tk.LEFT, padx=5)
+            ttk.Button(button_frame, text="取消", command=edit_window.destroy).pack(side=tk.LEFT, padx=5)
+            entry.bind("<Return>", lambda e: save_edit())
+        
+        score_tree.bind("<Double-1>", on_score_double_click)
+        
+        save_frame = ttk.Frame(scores_window)
+        save_frame.pack(fill=tk.X, padx=20, pady=(0, 20))
+        
+        def save_scores():
+            try:
+                # 批量修改满分设置，退出上下文后只写盘一次
+                with self.settings_manager.batch():
+                    for item_name in self.items:
+                        score = float(score_tree.item(item_name, "values")[1])
+                        self.settings_manager.set_max_score(item_name, score)
+
+                self._rebuild_page_plan()
+                self.reset_data()
+                self.load_data()
+                self.update_status("项目分数设置已保存并应用")
+                self.log_manager.log("项目分数设置已更新")
+                messagebox.showinfo("设置", "项目分数设置已保存并应用")
+            except ValueError:
+                messagebox.showerror("错误", "请输入有效的数字！")
+        
+        ttk.Button(save_frame, text="保存分数设置", command=save_scores).pack(side=tk.LEFT)
+
+    def open_class_settings(self):
+        class_window = tk.Toplevel(self.root)
+        class_window.title("班级管理")
+        class_window.geometry("800x400")
+        class_window.transient(self.root)
+        
+        main_frame = ttk.Frame(class_window)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        self.create_class_management_section(main_frame)
+
+    def create_class_management_section(self, parent):
+        # 创建表格来显示班级信息
+        columns = ("班级名称", "加权分数")
+        self.class_tree = ttk.Treeview(parent, columns=columns, show="headings", height=10)
+        
+        # 设置表头
+        for col in columns:
+            self.class_tree.heading(col, text=col)
+            self.class_tree.column(col, width=150)
+        
+        # 添加滚动条
+        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.class_tree.yview)
+        self.class_tree.configure(yscrollcommand=scrollbar.set)
+        
+        # 布局
+        self.class_tree.pack(side=tk.TOP, fill=tk.BOTH, expand=True, pady=(0, 10))
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=(0, 10))
+        
+        # 添加按钮框架
+        button_frame = ttk.Frame(parent)
+        button_frame.pack(fill=tk.X, pady=5)
+        
+        # 添加班级按钮
+        ttk.Button(button_frame, text="添加班级", command=self.add_class).pack(side=tk.LEFT, padx=5)
+        
+        # 删除班级按钮
+        ttk.Button(button_frame, text="删除选中班级", command=self.remove_class).pack(side=tk.LEFT, padx=5)
+        
+        # 上移班级按钮
+        ttk.Button(button_frame, text="上移", command=self.move_class_up).pack(side=tk.LEFT, padx=5)
+        
+        # 下移班级按钮
+        ttk.Button(button_frame, text="下移", command=self.move_class_down).pack(side=tk.LEFT, padx=5)
+        
+        # 保存设置按钮
+        ttk.Button(button_frame, text="保存班级设置", command=self.save_class_settings).pack(side=tk.LEFT, padx=5)
+        
+        # 加载班级配置按钮
+        ttk.Button(button_frame, text="加载班级配置", command=self.load_class_config_file).pack(side=tk.LEFT, padx=5)
+        
+        # 加载现有班级数据
+        self.load_class_data_to_tree()
+        
+        # 绑定选择事件
+        self.class_tree.bind("<<TreeviewSelect>>", self.on_class_select)
+        # 绑定双击事件用于编辑
+        self.class_tree.bind("<Double-1>", self.on_class_tree_double_click)
+        
+        # 保存选中的项目
+        self.selected_class_item = None
+    
+    def on_class_tree_double_click(self, event):
+        """处理表格双击事件，允许编辑单元格"""
+        # 获取点击的项目和列
+        item = self.class_tree.identify_row(event.y)
+        column = self.class_tree.identify_column(event.x)
+        
+        if item and column:
+            # 获取当前值
+            values = self.class_tree.item(item, "values")
+            col_index = int(column[1:]) - 1  # 转换为0基索引
+            current_value = values[col_index]
+            
+            # 创建编辑窗口
+            self.create_edit_window(item, col_index, current_value)
+    
+    def create_edit_window(self, item, col_index, current_value):
+        """创建编辑窗口"""
+        # 创建顶层窗口
+        edit_window = tk.Toplevel(self.class_tree)
+        edit_window.title("编辑")
+        edit_window.geometry("300x100")
+        edit_window.transient(self.class_tree)
+        edit_window.grab_set()
+        
+        # 居中显示
+        edit_window.geometry("+{}+{}".format(
+            edit_window.winfo_screenwidth() // 2 - 150,
+            edit_window.winfo_screenheight() // 2 - 50
+        ))
+        
+        # 创建输入框
+        ttk.Label(edit_window, text="请输入新值:").pack(pady=5)
+        entry_var = tk.StringVar(value=current_value)
+        entry = ttk.Entry(edit_window, textvariable=entry_var, width=30)
+        entry.pack(pady=5)
+        entry.select_range(0, tk.END)
+        entry.focus()
+        
+        # 保存按钮
+        def save_edit():
+            new_value = entry_var.get()
+            values = list(self.class_tree.item(item, "values"))
+            old_value = values[col_index]
+            values[col_index] = new_value
+            if col_index == 0 and new_value != old_value:
+                # 班级改名：行iid就是班级名，必须换iid重建该行，
+                # 并同步查重用的镜像集合，否则旧名一直占着查重名额
+                if new_value in self._class_name_set:
+                    messagebox.showwarning("警告", f"班级 '{new_value}' 已存在！")
+                    return
+                index = self.class_tree.index(item)
+                self.class_tree.delete(item)
+                self.class_tree.insert("", index, iid=new_value, values=values)
+                self._class_name_set.discard(old_value)
+                self._class_name_set.add(new_value)
+            else:
+                self.class_tree.item(item, values=values)
+            edit_window.destroy()
+        
+        # 按钮框架
+        button_frame = ttk.Frame(edit_window)
+        button_frame.pack(pady=5)
+        
+        ttk.Button(button_frame, text="保存", command=save_edit).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="取消", command=edit_window.destroy).pack(side=tk.LEFT, padx=5)
+        
+        # 绑定回车键保存
+        entry.bind("<Return>", lambda e: save_edit())
+        
+        # 等待窗口关闭
+        edit_window.wait_window()
+    
+    def load_class_data_to_tree(self):
+        """加载现有班级数据到表格"""
+        # 一次delete调用清空现有数据
+        children = self.class_tree.get_children()
+        if children:
+            self.class_tree.delete(*children)
+        
+        # 获取现有班级数据
+        current_classes = self.settings_manager.get_classes()
+        weighted_addition = self.settings_manager.get_weighted_addition()
+        
+        # 添加到表格
+        for class_name in current_classes:
+            weighted_score = weighted_addition.get(class_name, 0)
+            # 班级名直接作为行iid，跳过Tk的iid分配器，后续按名定位也更快
+            self.class_tree.insert("", "end", iid=class_name, values=(class_name, str(weighted_score)))
+        self._class_name_set = set(current_classes)
+    
+    def on_class_select(self, event):
+        """处理班级选择事件"""
+        selected_items = self.class_tree.selection()
+        if selected_items:
+            self.selected_class_item = selected_items[0]
+        else:
+            self.selected_class_item = None
+    
+    def add_class(self):
+        # 弹出对话框让用户输入班级名称
+        new_class_name = tk.simpledialog.askstring("添加班级", "请输入班级名称:")
+        if not new_class_name:
+            return  # 用户取消了输入
+        
+        new_weighted_score = "0"
+        
+        # 查重走镜像集合，不再逐行读取表格
+        if new_class_name in self._class_name_set:
+            messagebox.showwarning("警告", f"班级 '{new_class_name}' 已存在！")
+            return
+        
+        # 添加到表格
+        self.class_tree.insert("", "end", iid=new_class_name, values=(new_class_name, new_weighted_score))
+        self._class_name_set.add(new_class_name)
+    
+    def remove_class(self):
+        # 删除选中的班级
+        selected_items = self.class_tree.selection()
+        if not selected_items:
+            messagebox.showwarning("警告", "请先选择要删除的班级！")
+            return
+        
+        for item in selected_items:
+            # 行iid即班级名，同步更新镜像集合
+            self._class_name_set.discard(item)
+            self.class_tree.delete(item)
+        
+        # 保存更改
+        self.save_class_settings()
+    
+    def move_class_up(self):
+        """上移选中的班级"""
+        selected = self.class_tree.selection()
+        if not selected:
+            messagebox.showwarning("警告", "请先选择要移动的班级！")
+            return
+        
+        # 获取所有项目和选中项目的索引
+        all_items = self.class_tree.get_children()
+        selected_item = selected[0]
+        current_index = all_items.index(selected_item)
+        
+        # 如果已经在最顶部，则不移动
+        if current_index == 0:
+            return
+        
+        # 交换显示位置
+        self.class_tree.move(selected_item, "", current_index - 1)
+        
+        # 重新选择移动的项目
+        self.class_tree.selection_set(selected_item)
+    
+    def move_class_down(self):
+        """下移选中的班级"""
+        selected = self.class_tree.selection()
+        if not selected:
+            messagebox.showwarning("警告", "请先选择要移动的班级！")
+            return
+        
+        # 获取所有项目和选中项目的索引
+        all_items = self.class_tree.get_children()
+        selected_item = selected[0]
+        current_index = all_items.index(selected_item)
+        
+        # 如果已经在最底部，则不移动
+        if current_index == len(all_items) - 1:
+            return
+        
+        # 交换显示位置
+        self.class_tree.move(selected_item, "", current_index + 1)
+        
+        # 重新选择移动的项目
+        self.class_tree.selection_set(selected_item)
+    
+    def save_class_settings(self):
+        try:
+            classes = []
+            weighted_addition = {}
+            
+            # 从表格中获取班级数据，保持顺序
+            for item in self.class_tree.get_children():
+                values = self.class_tree.item(item, "values")
+                class_name = values[0].strip()
+                if class_name:
+                    classes.append(class_name)
+                    
+                    # 获取加权分数
+                    try:
+                        weighted_value = float(values[1])
+                    except ValueError:
+                        weighted_value = 0
+                    weighted_addition[class_name] = weighted_value
+            
+            self.settings_manager.set_classes(classes)
+            self.settings_manager.set_weighted_addition(weighted_addition)
+            
+            self.classes = classes
+            self.weighted_addition = weighted_addition.copy()
+            self._rebuild_weight_cache()
+            self._sync_score_store()
+            self.schedule_recompute()
+
+            # 更新主窗口的班级下拉列表
+            if self.class_combobox is not None:
+                self.class_combobox['values'] = self.classes
+            
+            # 保存到班级配置文件
+            self.save_class_config_file()
+            
+            messagebox.showinfo("设置", "班级设置已保存")
+            self.log_manager.log("班级设置已保存")
+        except Exception as e:
+            messagebox.showerror("错误", f"保存班级设置时出错：{str(e)}")
+            self.log_manager.log(f"保存班级设置时出错: {str(e)}")
+    
+    def save_class_config_file(self):
+        """保存班级配置到独立的JSON文件"""
+        try:
+            class_config = {
+                "classes": self.classes,
+                "weighted_addition": self.weighted_addition
+            }
+            
+            # 使用固定文件名保存班级配置；紧凑格式一次写出，
+            # 省掉indent美化和default=str回调的逐键开销
+            config_file = self._class_config_path
+            payload = _dumps(class_config)
+            with open(config_file, 'wb') as f:
+                f.write(payload)
+            
+            self.log_manager.log(f"班级配置已保存到 {config_file}")
+        except Exception as e:
+            messagebox.showerror("错误", f"保存班级配置文件时出错：{str(e)}")
+            self.log_manager.log(f"保存班级配置文件时出错: {str(e)}")
+    
+    def load_class_config_file(self):
+        """从独立的JSON文件加载班级配置"""
+        try:
+            config_file = self._class_config_path
+            if os.path.exists(config_file):
+                with open(config_file, 'rb') as f:
+                    class_config = _loads(f.read())
+                
+                # 更新班级和加权分数
+                self.classes = class_config.get("classes", [])
+                self.weighted_addition = class_config.get("weighted_addition", {})
+                self._rebuild_weight_cache()
+                self._sync_score_store()
+                self.schedule_recompute()
+                
+                # 更新设置管理器
+                self.settings_manager.set_classes(self.classes)
+                self.settings_manager.set_weighted_addition(self.weighted_addition)
+                
+                # 更新表格显示
+                self.update_class_tree_from_config()
+                
+                # 更新主窗口的班级下拉列表
+                if self.class_combobox is not None:
+                    self.class_combobox['values'] = self.classes
+                
+                self.log_manager.log(f"班级配置已从 {config_file} 加载")
+                return True
+            else:
+                self.log_manager.log("班级配置文件不存在，使用默认配置")
+                return False
+        except Exception as e:
+            messagebox.showerror("错误", f"加载班级配置文件时出错：{str(e)}")
+            self.log_manager.log(f"加载班级配置文件时出错: {str(e)}")
+            return False
+    
+    def update_class_tree_from_config(self):
+        """根据配置更新班级表格显示"""
+        # 一次delete调用清空现有数据
+        children = self.class_tree.get_children()
+        if children:
+            self.class_tree.delete(*children)
+        
+        # 添加班级数据到表格
+        for class_name in self.classes:
+            weighted_score = self.weighted_addition.get(class_name, 0)
+            self.class_tree.insert("", "end", iid=class_name, values=(class_name, weighted_score))
+        self._class_name_set = set(self.classes)
+    
+    def show_about(self):
+        about_window = tk.Toplevel(self.root)
+        about_window.title("关于流动红旗评比系统")
+        about_window.geometry("720x650")
+        about_window.resizable(True, True)
+        about_window.configure(bg="#f5f5f5")
+        
+        about_window.transient(self.root)
+        about_window.grab_set()
+        
+        # 创建主框架
+        main_frame = ttk.Frame(about_window, padding="20")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 标题区域
+        title_frame = ttk.Frame(main_frame)
+        title_frame.pack(fill=tk.X, pady=(0, 20))
+        
+        title_label = ttk.Label(
+            title_frame, 
+            text="流动红旗评比系统", 
+            font=("微软雅黑", 20, "bold"),
+            foreground="#2c3e50"
+        )
+        title_label.pack()
+        
+        subtitle_label = ttk.Label(
+            title_frame,
+            text="学校流动红旗评比管理系统",
+            font=self.font_regular10,
+            foreground="#7f8c8d"
+        )
+        subtitle_label.pack(pady=(5, 0))
+        
+        # 内容区域
+        content_frame = ttk.Frame(main_frame)
+        content_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 左侧信息区域
+        left_frame = ttk.Frame(content_frame)
+        left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
+        
+        # 版本信息
+        version_frame = ttk.LabelFrame(left_frame, text="版本信息", padding="10")
+        version_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        ttk.Label(version_frame, text="版本: V1.5.0", font=("微软雅黑", 11, "bold")).pack(anchor=tk.W)
+        ttk.Label(version_frame, text="发布日期: 2025年", font=self.font_regular10).pack(anchor=tk.W, pady=(5, 0))
+        
+        # 开发者信息
+        dev_frame = ttk.LabelFrame(left_frame, text="开发者信息", padding="10")
+        dev_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        github_link = "https://github.com/Bao-Jiaozixing/flowing-red-flag-evaluation"
+        link_label = ttk.Label(dev_frame, text=f"开发团队: {github_link}", font=self.font_regular10, foreground="blue", cursor="hand2")
+        link_label.pack(anchor=tk.W)
+        link_label.bind("<Button-1>", lambda e: self.open_link(github_link))
+        
+        # 系统功能
+        info_frame = ttk.LabelFrame(left_frame, text="系统功能", padding="10")
+        info_frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(info_frame, text="支持功能:", font=("微软雅黑", 10, "bold")).pack(anchor=tk.W)
+        
+        features = [
+            "• 日常评分管理", "• 惩罚加分管理", "• 数据导入导出",
+            "• 自动计算总分", "• 班级排名显示", "• 历史记录保存"
+        ]
+        
+        for feature in features:
+            ttk.Label(info_frame, text=feature, font=self.font_regular9).pack(anchor=tk.W, padx=(10, 0), pady=2)
+        
+        # 右侧信息区域
+        right_frame = ttk.Frame(content_frame)
+        right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(10, 0))
+        
+        # 使用模型
+        model_frame = ttk.LabelFrame(right_frame, text="使用模型", padding="10")
+        model_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        models = [
+            "• Deepseek-V3",
+            "• Deepseek-R1",
+            "• Qwen-3-Coder"
+        ]
+        
+        for model in models:
+            ttk.Label(model_frame, text=model, font=self.font_regular9).pack(anchor=tk.W, pady=1)
+        
+        # 第三方库声明
+        license_frame = ttk.LabelFrame(right_frame, text="第三方库声明", padding="10")
+        license_frame.pack(fill=tk.BOTH, expand=True)
+        
+        libraries = [
+            "• tkinter - Python标准GUI库",
+            "• pandas - 数据处理库 (用于Excel导出)",
+            "• openpyxl - Excel文件处理库 (pandas依赖)"
+        ]
+        
+        for library in libraries:
+            ttk.Label(license_frame, text=library, font=self.font_regular9).pack(anchor=tk.W, padx=(0, 0), pady=1)
+        
+        # 底部版权信息
+        copyright_frame = ttk.Frame(main_frame)
+        copyright_frame.pack(fill=tk.X, pady=(20, 0))
+        
+        ttk.Separator(copyright_frame, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(
+            copyright_frame, 
+            text="© 2025 流动红旗评比系统. 保留所有权利.", 
+            font=self.font_regular9, 
+            foreground="#95a5a6"
+        ).pack()
+        
+        # 关闭按钮
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(20, 0))
+        
+        close_button = ttk.Button(
+            button_frame, 
+            text="关闭", 
+            command=about_window.destroy,
+            width=15
+        )
+        close_button.pack(side=tk.RIGHT)
+
+    def open_link(self, url):
+        webbrowser.open_new(url)
+
+    def _prepare_path(self, file_path):
+        """规范化保存路径并确保其所在目录存在
+
+        不再预先用 os.path.exists/os.access 探测可写性：真正不可写时
+        open() 会抛出 PermissionError/OSError，由各保存操作的异常分支
+        统一转成提示框，省去每次保存前的多次磁盘stat调用。
+        """
+        file_path = os.path.normpath(file_path)
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return file_path
+
+    def save_data(self):
+        try:
+            # 只取一次本地时间，文件名和save_time两种格式都从它派生
+            now = time.localtime()
+            default_filename = f"流动红旗分数数据_{time.strftime('%Y%m%d_%H%M%S', now)}.json"
+            
+            file_path = filedialog.asksaveasfilename(
+                initialfile=default_filename,
+                defaultextension=".json",
+                filetypes=[("JSON文件", "*.json"), ("所有文件", "*.*")],
+                title="保存数据",
+                initialdir=self.settings_manager.get_root_directory()
+            )
+            
+            if not file_path:
+                self.log_manager.log("用户取消了保存操作")
+                return
+            
+            self.log_manager.log(f"用户选择的文件路径: {file_path}")
+            
+            # 验证文件路径
+            if not file_path.strip():
+                error_msg = "文件路径不能为空"
+                self.root.lift()
+                self.root.focus_force()
+                messagebox.showerror("错误", error_msg)
+                self.log_manager.log(f"保存数据时出错: {error_msg}")
+                return
+            
+            # 规范化路径并确保目录存在
+            file_path = self._prepare_path(file_path)
+            self.log_manager.log(f"规范化后的文件路径: {file_path}")
+            
+            data = {
+                'scores': self.get_all_scores(),
+                'punishments': self.punishments,
+                'weighted_addition': self.weighted_addition,
+                'classes': self.settings_manager.get_classes(),
+                'save_time': time.strftime("%Y-%m-%d %H:%M:%S", now)
+            }
+            
+            # 先在内存里编码完，再一次write写出，
+            # 避免json.dump带indent时的逐token小块写入
+            payload = _dumps(data, indent=True)
+            with open(file_path, 'wb') as f:
+                f.write(payload)
+            
+            # 保存历史记录用于撤销操作
+            self.save_snapshot()
+            
+            self.update_status("数据保存成功")
+            self.log_manager.log("数据保存成功")
+            self.log_manager.flush()
+            messagebox.showinfo("成功", f"数据已保存到 {file_path}")
+        except PermissionError as e:
+            error_msg = f"没有权限保存到指定位置，请选择其他位置或以管理员身份运行程序: {str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("权限错误", error_msg)
+            self.log_manager.log(f"保存数据时出错: {error_msg}")
+        except FileNotFoundError as e:
+            error_msg = f"指定的文件路径不存在，请检查路径是否正确: {str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("路径错误", error_msg)
+            self.log_manager.log(f"保存数据时出错: {error_msg}")
+        except OSError as e:
+            error_msg = f"操作系统错误: {str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("系统错误", error_msg)
+            self.log_manager.log(f"保存数据时出错: {error_msg}")
+        except Exception as e:
+            error_msg = f"保存数据时出错：{str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("错误", error_msg)
+            self.log_manager.log(f"保存数据时出错: {error_msg}")
+    
+    def save_as_data(self):
+        try:
+            data = {
+                'scores': self.get_all_scores(),
+                'punishments': self.punishments,
+                'weighted_addition': self.weighted_addition,
+                'classes': self.settings_manager.get_classes(),
+                'save_time': time.strftime("%Y-%m-%d %H:%M:%S")
+            }
+            
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".json",
+                filetypes=[("JSON文件", "*.json"), ("所有文件", "*.*")],
+                title="另存为"
+            )
+            
+            if not file_path:
+                self.log_manager.log("用户取消了另存为操作")
+                return
+            
+            self.log_manager.log(f"用户选择的文件路径: {file_path}")
+            
+            # 验证文件路径
+            if not file_path.strip():
+                error_msg = "文件路径不能为空"
+                self.root.lift()
+                self.root.focus_force()
+                messagebox.showerror("错误", error_msg)
+                self.log_manager.log(f"另存为数据时出错: {error_msg}")
+                return
+            
+            # 规范化路径并确保目录存在
+            file_path = self._prepare_path(file_path)
+            self.log_manager.log(f"规范化后的文件路径: {file_path}")
+            
+            payload = _dumps(data, indent=True)
+            with open(file_path, 'wb') as f:
+                f.write(payload)
+            
+            self.history_manager.add_record(data)
+            self.update_status(f"数据已另存为 {file_path}")
+            self.log_manager.log(f"数据另存为: {file_path}")
+            messagebox.showinfo("成功", f"数据已另存为 {file_path}")
+        except PermissionError as e:
+            error_msg = f"没有权限保存到指定位置，请选择其他位置或以管理员身份运行程序: {str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("权限错误", error_msg)
+            self.log_manager.log(f"另存为数据时出错: {error_msg}")
+        except FileNotFoundError as e:
+            error_msg = f"指定的文件路径不存在，请检查路径是否正确: {str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("路径错误", error_msg)
+            self.log_manager.log(f"另存为数据时出错: {error_msg}")
+        except OSError as e:
+            error_msg = f"操作系统错误: {str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("系统错误", error_msg)
+            self.log_manager.log(f"另存为数据时出错: {error_msg}")
+        except Exception as e:
+            error_msg = f"另存为数据时出错：{str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("错误", error_msg)
+            self.log_manager.log(f"另存为数据时出错: {error_msg}")
+    
+    def _snapshot_tree_by_class(self, tree):
+        """一次遍历把整个表格读成 {班级: 行值}，之后按班级取数为O(1)"""
+        return {values[0]: values
+                for values in (tree.item(i, "values") for i in tree.get_children())}
+
+    def _iter_total_rows(self):
+        """逐班级生成总分表的行（CSV导出流式消费，不必先物化整表）"""
+        # 每个单时段项目的表格只整体读一次，
+        # 班级循环里不再按班级逐行扫描Treeview
+        page_rows = {}
+        for page_name in self.items:
+            if page_name in self._dual_period_set:
+                continue
+            page_rows[page_name] = self._snapshot_tree_by_class(self.pages[page_name].tree)
+        
+        for cls in self.classes:
+            row = [cls]
+            for page_name in self.items:
+                if page_name in self._dual_period_set:
+                    page_frame = self.pages[page_name]
+                    am_avg = self.get_class_average(page_frame.am_tree, cls)
+                    pm_avg = self.get_class_average(page_frame.pm_tree, cls)
+                    avg_score = (am_avg + pm_avg) / 2
+                    row.append(round(avg_score, 2))
+                else:
+                    class_row = page_rows[page_name].get(cls)
+                    # 表格里缺该班级时按0分补位，保证各行列数一致
+                    row.append(class_row[6] if class_row is not None else 0)
+            row.append(self.weighted_addition[cls])
+            # 奖惩合计与备注读增量维护的缓存，导出时不再逐条扫描
+            punishment_score = self._punish_total.get(cls, 0)
+            row.append(punishment_score)
+            row.append(self._punish_notes_joined.get(cls, ""))
+            # 总分直接读calculate_totals维护的权威缓存，不再逐列转float重加
+            row.append(round(self._class_total.get(cls, 0.0), 2))
+            
+            yield row
+
+    def save_total_score_table(self):
+        try:
+            self._ensure_all_pages_built()
+            self.calculate_totals()
+            
+            columns = ["班级", "早迟到", "早读", "节能开窗", "仪容仪表", "间操", "午休", 
+                      "上下午各班卫生", "巡视", "及时上交文件", "宿舍", "加权", "惩罚", "惩罚备注", "总分"]
+            
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".csv",
+                filetypes=[("CSV文件", "*.csv"), ("Excel文件", "*.xlsx"), ("PDF文件", "*.pdf"), ("所有文件", "*.*")],
+                title="保存总分表格"
+            )
+            
+            # 检查用户是否取消了保存操作
+            if not file_path:
+                self.log_manager.log("用户取消了保存总分表格操作")
+                return
+            
+            self.log_manager.log(f"用户选择的文件路径: {file_path}")
+            
+            # 验证文件路径
+            if not file_path.strip():
+                error_msg = "文件路径不能为空"
+                self.root.lift()
+                self.root.focus_force()
+                messagebox.showerror("错误", error_msg)
+                self.log_manager.log(f"保存总分表格时出错: {error_msg}")
+                return
+            
+            # 规范化路径并确保目录存在
+            file_path = self._prepare_path(file_path)
+            self.log_manager.log(f"规范化后的文件路径: {file_path}")
+            
+            if file_path.endswith('.csv'):
+                # 行由生成器流式产出，1MB写缓冲把小行写入合并成大块落盘
+                with open(file_path, 'w', newline='', encoding='utf-8-sig',
+                          buffering=1 << 20) as f:
+                    writer = csv.writer(f)
+                    writer.writerow(columns)
+                    writer.writerows(self._iter_total_rows())
+            elif file_path.endswith('.xlsx'):
+                try:
+                    # 优先用openpyxl的只写模式逐行流式写出，
+                    # 不必先物化整表，也省掉DataFrame的中间拷贝
+                    import openpyxl
+                    workbook = openpyxl.Workbook(write_only=True)
+                    worksheet = workbook.create_sheet("总分表")
+                    worksheet.append(columns)
+                    for row in self._iter_total_rows():
+                        worksheet.append(row)
+                    workbook.save(file_path)
+                except ImportError:
+                    # 没有openpyxl时退回pandas（其Excel写出同样依赖引擎库）
+                    try:
+                        if self._pandas is None:
+                            import pandas
+                            self._pandas = pandas
+                        df = self._pandas.DataFrame(list(self._iter_total_rows()), columns=columns)
+                        df.to_excel(file_path, index=False)
+                    except ImportError:
+                        error_msg = "未安装openpyxl或pandas库，无法导出Excel\n请运行: pip install openpyxl"
+                        self.root.lift()
+                        self.root.focus_force()
+                        messagebox.showerror("错误", error_msg)
+                        self.log_manager.log(f"保存总分表格时出错: {error_msg}")
+                        return
+            elif file_path.endswith('.pdf'):
+                try:
+                    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+                    from reportlab.lib.pagesizes import letter, A4
+                    from reportlab.lib import colors
+                    from reportlab.lib.styles import getSampleStyleSheet
+                    from reportlab.pdfbase import pdfmetrics
+                    from reportlab.pdfbase.ttfonts import TTFont
+                    from reportlab.lib.units import inch
+                    import os
+                    
+                    # 注册中文字体（如果需要）
+                    font_path = os.path.join(os.path.dirname(__file__), 'SimSun.ttf')
+                    if os.path.exists(font_path):
+                        pdfmetrics.registerFont(TTFont('SimSun', font_path))
+                    else:
+                        # 如果找不到字体文件，尝试使用系统默认中文字体
+                        try:
+                            pdfmetrics.registerFont(TTFont('SimSun', 'C:/Windows/Fonts/simsun.ttc'))
+                        except:
+                            pass  # 如果仍然找不到字体，则使用默认字体（可能仍显示为方框）
+                    
+                    doc = SimpleDocTemplate(file_path, pagesize=A4)
+                    elements = []
+                    
+                    # 添加标题
+                    styles = getSampleStyleSheet()
+                    # 设置标题字体为中文字体
+                    from reportlab.lib.styles import ParagraphStyle
+                    title_style = ParagraphStyle(
+                        'CustomTitle',
+                        parent=styles['Title'],
+                        fontName='SimSun',
+                        fontSize=24
+                    )
+                    title = Paragraph("流动红旗评比总分表格", title_style)
+                    elements.append(title)
+                    
+                    # 准备表格数据
+                    table_data = [columns] + list(self._iter_total_rows())
+                    
+                    # 创建表格
+                    table = Table(table_data)
+                    table.setStyle(TableStyle([
+                        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                        ('FONTNAME', (0, 0), (-1, 0), 'SimSun'),
+                        ('FONTSIZE', (0, 0), (-1, 0), 10),
+                        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                        ('FONTNAME', (0, 1), (-1, -1), 'SimSun')
+                    ]))
+                    
+                    elements.append(table)
+                    doc.build(elements)
+                except ImportError:
+                    error_msg = "未安装reportlab库，无法导出PDF\n请运行: pip install reportlab"
+                    self.root.lift()
+                    self.root.focus_force()
+                    messagebox.showerror("错误", error_msg)
+                    self.log_manager.log(f"保存总分表格时出错: {error_msg}")
+                    return
+            else:
+                with open(file_path, 'w', newline='', encoding='utf-8-sig',
+                          buffering=1 << 20) as f:
+                    writer = csv.writer(f)
+                    writer.writerow(columns)
+                    writer.writerows(self._iter_total_rows())
+            
+            self.update_status(f"总分表格已保存到 {file_path}")
+            self.log_manager.log(f"总分表格已保存到: {file_path}")
+            messagebox.showinfo("成功", f"总分表格已保存到 {file_path}")
+        except PermissionError as e:
+            error_msg = f"没有权限保存到指定位置，请选择其他位置或以管理员身份运行程序: {str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("权限错误", error_msg)
+            self.log_manager.log(f"保存总分表格时出错: {error_msg}")
+        except FileNotFoundError as e:
+            error_msg = f"指定的文件路径不存在，请检查路径是否正确: {str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("路径错误", error_msg)
+            self.log_manager.log(f"保存总分表格时出错: {error_msg}")
+        except OSError as e:
+            error_msg = f"操作系统错误: {str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("系统错误", error_msg)
+            self.log_manager.log(f"保存总分表格时出错: {error_msg}")
+        except Exception as e:
+            error_msg = f"保存总分表格时出错：{str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("错误", error_msg)
+            self.log_manager.log(f"保存总分表格时出错: {error_msg}")
+    
+    def on_closing(self):
+        if hasattr(self, 'time_after_id'):
+            self.root.after_cancel(self.time_after_id)
+        if self._recompute_after is not None:
+            self.root.after_cancel(self._recompute_after)
+        if self._snapshot_after is not None:
+            self.root.after_cancel(self._snapshot_after)
+        self.root.destroy()
+    
+    def load_data(self):
+        try:
+            data_file = filedialog.askopenfilename(
+                defaultextension=".json",
+                filetypes=[("JSON文件", "*.json"), ("所有文件", "*.*")],
+                title="选择要加载的数据文件"
+            )
+            
+            # 检查用户是否取消了加载操作
+            if not data_file:
+                self.log_manager.log("用户取消了加载数据操作")
+                return
+            
+            self.log_manager.log(f"用户选择的数据文件: {data_file}")
+            
+            # 检查文件是否存在
+            if not os.path.exists(data_file):
+                error_msg = f"指定的数据文件不存在: {data_file}"
+                self.root.lift()
+                self.root.focus_force()
+                messagebox.showerror("文件错误", error_msg)
+                self.log_manager.log(f"加载数据时出错: {error_msg}")
+                return
+            
+            # 检查文件是否可读
+            if not os.access(data_file, os.R_OK):
+                error_msg = f"没有权限读取文件: {data_file}"
+                self.root.lift()
+                self.root.focus_force()
+                messagebox.showerror("权限错误", error_msg)
+                self.log_manager.log(f"加载数据时出错: {error_msg}")
+                return
+            
+            # 一次性读入整个文件后再解析，避免流式解析的多次小块读取
+            with open(data_file, 'rb') as f:
+                data = _loads(f.read())
+                
+            # 直接同步班级设置
+            loaded_classes = data.get('classes', self.settings_manager.get_classes())
+            loaded_scores = data.get('scores', {})
+            
+            # 同步班级设置
+            self.settings_manager.set_classes(loaded_classes)
+            self.classes = loaded_classes
+            
+            # 更新加权分数设置以匹配新班级
+            loaded_weighted_addition = data.get('weighted_addition', {})
+            for cls in loaded_classes:
+                if cls not in loaded_weighted_addition:
+                    loaded_weighted_addition[cls] = 0  # 默认加权分数为0
+            self.settings_manager.set_weighted_addition(loaded_weighted_addition)
+            self.weighted_addition = loaded_weighted_addition.copy()
+            self._rebuild_weight_cache()
+
+            # 班级列表可能已变化，重建内存分数存储后再填充
+            self._init_score_store()
+            self.load_scores(loaded_scores)
+            self.punishments = self._normalize_punishments(data.get('punishments', {}))
+            self._rebuild_punish_cache()
+            weighted_data = data.get('weighted_addition', {})
+            self.weighted_addition.update(weighted_data)
+            self.schedule_recompute()
+            
+            # self.classes已在此前设置为loaded_classes，无需重复设置
+            # self.classes = loaded_classes
+            
+            self.update_status("数据加载成功")
+            self.log_manager.log("数据加载成功")
+            messagebox.showinfo("成功", f"数据已从 {data_file} 加载")
+        except FileNotFoundError as e:
+            error_msg = f"未找到指定的数据文件: {str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("文件错误", error_msg)
+            self.log_manager.log(f"加载数据时出错: {error_msg}")
+        except PermissionError as e:
+            error_msg = f"没有权限读取数据文件，请检查文件权限: {str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("权限错误", error_msg)
+            self.log_manager.log(f"加载数据时出错: {error_msg}")
+        except json.JSONDecodeError as e:
+            error_msg = f"数据文件格式错误，无法解析JSON: {str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("格式错误", error_msg)
+            self.log_manager.log(f"加载数据时出错: {error_msg}")
+        except Exception as e:
+            error_msg = f"加载数据时出错：{str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("错误", error_msg)
+            self.log_manager.log(f"加载数据时出错: {error_msg}")
+    
+    def get_all_scores(self):
+        """从内存分数存储导出各项目的表格数据
+
+        存储是权威数据源，保存/快照不再遍历Treeview，也无需为此
+        把惰性标签页先构建出来。
+        """
+        scores = {}
+        for page_name in self.items:
+            if page_name in self._dual_period_set:
+                scores[f"{page_name}_am"] = [
+                    self._row_values(page_name, 'am', cls) for cls in self.classes]
+                scores[f"{page_name}_pm"] = [
+                    self._row_values(page_name, 'pm', cls) for cls in self.classes]
+            else:
+                scores[page_name] = [
+                    self._row_values(page_name, '', cls) for cls in self.classes]
+        return scores
+    
+    def get_tree_data(self, tree):
+        return [tree.item(item, "values") for item in tree.get_children()]
+    
+    def save_snapshot(self):
+        snapshot = {
+            'scores': self.get_all_scores(),
+            'punishments': self.punishments.copy(),
+            'weighted_addition': self.weighted_addition.copy()
+        }
+        # 内容没变的快照直接跳过，省掉历史记录里的差分和深拷贝
+        if orjson is not None:
+            payload = orjson.dumps(snapshot, option=orjson.OPT_SORT_KEYS)
+        else:
+            payload = json.dumps(snapshot, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        snapshot_hash = hashlib.blake2b(payload, digest_size=8).digest()
+        if snapshot_hash == self._last_snapshot_hash:
+            return
+        self._last_snapshot_hash = snapshot_hash
+        self.history_manager.add_record(snapshot)
+    
+    def load_scores(self, scores_data):
+        self._ensure_all_pages_built()
+
+        # 先把文件数据一次性批量写入内存存储
+        for page_name, page_data in scores_data.items():
+            if page_name.endswith("_am") and len(page_name) > 3:
+                real_page_name, period = page_name[:-3], 'am'
+            elif page_name.endswith("_pm") and len(page_name) > 3:
+                real_page_name, period = page_name[:-3], 'pm'
+            else:
+                real_page_name, period = page_name, ''
+            self._store_rows(real_page_name, period, page_data)
+
+        # 再从存储整体刷新各表格视图（复用已有行iid，不删除重建）
+        self._refresh_views()
+
+    def _refresh_views(self):
+        for page_name, page_frame, is_dual, _max_score in self._page_plan:
+            if page_frame is None:
+                continue
+            if is_dual:
+                self._refresh_tree(page_frame.am_tree, page_name, 'am')
+                self._refresh_tree(page_frame.pm_tree, page_name, 'pm')
+            else:
+                self._refresh_tree(page_frame.tree, page_name, '')
+
+    def _refresh_tree(self, tree, page_name, period):
+        """按内存存储批量回写一页的行值
+
+        回写期间先把列隐藏，Tk在恢复displaycolumns时统一重绘一次，
+        不再每行item()都触发已显示表格的布局。
+        """
+        display = tree["displaycolumns"]
+        tree["displaycolumns"] = ()
+        if set(tree._row_by_class) != set(self.classes):
+            # 班级列表变化（如加载了不同班级的数据文件）：整页重建行，
+            # 不能按旧班级的行iid写回
+            children = tree.get_children()
+            if children:
+                tree.delete(*children)
+            tree._row_by_class = {
+                cls: tree.insert("", "end",
+                                 values=self._row_values(page_name, period, cls))
+                for cls in self.classes}
+        else:
+            for cls, iid in tree._row_by_class.items():
+                tree.item(iid, values=self._row_values(page_name, period, cls))
+        tree["displaycolumns"] = display
+    
+    def _store_rows(self, page_name, period, rows):
+        """把一页的行数据写回内存分数存储"""
+        score_map = self.scores.get((page_name, period))
+        avg_map = self.score_avgs.get((page_name, period))
+        if score_map is None:
+            return
+        for row in rows:
+            cls = row[0]
+            if cls in score_map:
+                try:
+                    score_map[cls] = [float(v) for v in row[1:6]]
+                    avg_map[cls] = float(row[6])
+                except (ValueError, IndexError):
+                    continue
+
+
+    
+    def show_history(self):
+        try:
+            history_window = tk.Toplevel(self.root)
+            history_window.title("历史记录")
+            history_window.geometry("800x500")
+            history_window.transient(self.root)
+            
+            main_frame = ttk.Frame(history_window)
+            main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+            
+            columns = ("保存时间", "操作")
+            tree = ttk.Treeview(main_frame, columns=columns, show="headings")
+            tree.heading("保存时间", text="保存时间")
+            tree.heading("操作", text="操作")
+            tree.column("保存时间", width=200)
+            tree.column("操作", width=300)
+            
+            tree.pack(fill=tk.BOTH, expand=True)
+            
+            scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=tree.yview)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            tree.configure(yscrollcommand=scrollbar.set)
+            
+            history = self.history_manager.get_history()
+            self.log_manager.log(f"获取到 {len(history)} 条历史记录")
+            
+            # 批量填充：填充期间摘掉滚动条回调（值必须是空串，传None
+            # 会被Tkinter当作"未设置该选项"直接忽略），插入循环里用
+            # 局部绑定，每行少一次属性查找，也不触发逐行的滚动条更新
+            tree.configure(yscrollcommand='')
+            insert = tree.insert
+            for record in history:
+                insert("", "end", values=(record['date'], "保存数据"))
+            tree.configure(yscrollcommand=scrollbar.set)
+            
+            load_frame = ttk.Frame(history_window)
+            load_frame.pack(fill=tk.X, padx=10, pady=5)
+            
+            def load_selected():
+                selected = tree.selection()
+                if not selected:
+                    error_msg = "请选择一条历史记录"
+                    self.root.lift()
+                    self.root.focus_force()
+                    messagebox.showerror("选择错误", error_msg)
+                    self.log_manager.log(f"加载历史记录时出错: {error_msg}")
+                    return
+                
+                item = selected[0]
+                index = tree.index(item)
+                
+                history = self.history_manager.get_history()
+                if 0 <= index < len(history):
+                    try:
+                        record_data = history[index]['data']
+                        self.load_scores(record_data.get('scores', {}))
+                        self.punishments = record_data.get('punishments', {}).copy()
+                        self._rebuild_punish_cache()
+                        weighted_data = record_data.get('weighted_addition', {})
+                        self.weighted_addition.clear()
+                        self.weighted_addition.update(weighted_data)
+                        self._rebuild_weight_cache()
+                        self._last_snapshot_hash = None
+                        self.update_status(f"已加载历史记录: {history[index]['date']}")
+                        self.log_manager.log(f"加载历史记录: {history[index]['date']}")
+                        self.schedule_recompute()  # 回到空闲时重新计算总分
+                        history_window.destroy()
+                    except Exception as e:
+                        error_msg = f"加载历史记录时出错：{str(e)}"
+                        self.root.lift()
+                        self.root.focus_force()
+                        messagebox.showerror("错误", error_msg)
+                        self.log_manager.log(f"加载历史记录时出错: {error_msg}")
+                else:
+                    error_msg = f"无法加载选中的记录：索引 {index} 超出范围 [0, {len(history)})"
+                    self.root.lift()
+                    self.root.focus_force()
+                    messagebox.showerror("索引错误", error_msg)
+                    self.log_manager.log(f"加载历史记录时出错: {error_msg}")
+            
+            ttk.Button(load_frame, text="加载选中记录", command=load_selected).pack(side=tk.LEFT)
+        except Exception as e:
+            error_msg = f"显示历史记录窗口时出错：{str(e)}"
+            self.root.lift()
+            self.root.focus_force()
+            messagebox.showerror("错误", error_msg)
+            self.log_manager.log(f"显示历史记录时出错: {error_msg}")
+    
+    def undo_action(self):
+        if self.history_manager.can_undo():
+            previous_data = self.history_manager.undo()
+            if previous_data:
+                self.load_scores(previous_data.get('scores', {}))
+                self.punishments = previous_data.get('punishments', {}).copy()
+                self._rebuild_punish_cache()
+                weighted_data = previous_data.get('weighted_addition', {})
+                self.weighted_addition.clear()
+                self.weighted_addition.update(weighted_data)
+                self._rebuild_weight_cache()
+                # 历史位置变了，去重哈希作废，否则与上次快照内容相同的
+                # 新编辑会被跳过而无法再撤销
+                self._last_snapshot_hash = None
+                self.update_status("已撤销操作")
+                self.log_manager.log("执行撤销操作")
+                self.schedule_recompute()
+            else:
+                self.update_status("无法撤销操作")
+        else:
+            self.update_status("没有可撤销的操作")
+            self.log_manager.log("尝试撤销操作但没有历史记录")
+    
+    def redo_action(self):
+        if self.history_manager.can_redo():
+            next_data = self.history_manager.redo()
+            if next_data:
+                self.load_scores(next_data.get('scores', {}))
+                self.punishments = next_data.get('punishments', {}).copy()
+                self._rebuild_punish_cache()
+                weighted_data = next_data.get('weighted_addition', {})
+                self.weighted_addition.clear()
+                self.weighted_addition.update(weighted_data)
+                self._rebuild_weight_cache()
+                self._last_snapshot_hash = None
+                self.update_status("已重做操作")
+                self.log_manager.log("执行重做操作")
+                self.schedule_recompute()
+            else:
+                self.update_status("无法重做操作")
+        else:
+            self.update_status("没有可重做的操作")
+            self.log_manager.log("尝试重做操作但没有历史记录")
+    
+    def toggle_fullscreen(self):
+        self._fullscreen = not self._fullscreen
+        self.root.attributes('-fullscreen', self._fullscreen)
+    
+    def on_tab_change(self, event):
+        self.destroy_entry()
+        # 首次切换到尚未构建的标签页时再真正构建页面
+        name = self.notebook.tab(self.notebook.select(), "text")
+        if name in self._lazy_pages:
+            self.notebook.select(self._ensure_page_built(name))
+    
+    def _on_entry_destroyed(self, entry):
+        if self._active_entry is entry:
+            self._active_entry = None
+
+    def destroy_entry(self):
+        # 只跟踪到的那一个编辑框需要处理，不再遍历全部子控件
+        if self._active_entry is not None:
+            self._active_entry.destroy()
+    
+    def switch_language(self, language):
+        """切换语言"""
+        self.settings_manager.set_language(language)
+        messagebox.showinfo("语言切换", "语言设置已保存，请重启程序以应用更改")
+        self.log_manager.log(f"语言已切换为: {language}")
+    
+    # 多语言支持字典
+    language_dict = {
+        'zh': {
+            'file': '文件',
+            'edit': '编辑',
+            'view': '视图',
+            'data': '数据',
+            'settings': '设置',
+            'tools': '工具',
+            'help': '帮助',
+            'save_data': '保存数据',
+            'save_as': '另存为',
+            'load_data': '加载数据',
+            'export_table': '导出总分表格',
+            'exit': '退出',
+            'undo': '撤销',
+            'redo': '重做',
+            'reset_data': '复原数据',
+            'toggle_fullscreen': '全屏切换',
+            'manage_punishments': '奖惩管理',
+            'history': '历史记录',
+            'system_settings': '系统设置',
+            'calculate_total': '计算总分',
+            'output_table': '输出表格',
+            'evaluation_result': '评比结果',
+            'export_table_alt': '导出表格',
+            'about': '关于系统',
+            'language': '语言',
+            'chinese': '中文'
+        }
+    }
+
+if __name__ == "__main__":
+    root = tk.Tk()  # 使用标准的tk.Tk
+    
+    try:
+        root.iconbitmap('icon.ico')
+    except tk.TclError:
+        _logger.warning("无法加载图标文件，请确保icon.ico文件存在于程序目录中")
+
+    app = FlowingRedFlagEvaluationSystem(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_closing)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,142 @@
+# 流动红旗评比系统 (Flowing Red Flag Evaluation System)
+# Copyright (C) 2025 流动红旗评比系统开发团队
+#
+# 本程序是自由软件，遵循GNU Affero通用公共许可证版本3或任何更新版本。
+# 更多信息请查看项目根目录的 LICENSE 文件和 README.md 文件。
+
+import collections
+import copy
+import datetime
+import json
+import zlib
+
+
+def _pack(changes):
+    """把差异字典压缩成二进制blob
+
+    元组路径按 scores页/顶层键 拆成两个普通字典后JSON编码，
+    zlib级别1在这种重复率很高的表格文本上已有数倍压缩比，
+    且压缩耗时可以忽略。
+    """
+    scores, other = {}, {}
+    for path, value in changes.items():
+        if len(path) == 2:
+            scores[path[1]] = value
+        else:
+            other[path[0]] = value
+    payload = json.dumps([scores, other], ensure_ascii=False).encode('utf-8')
+    return zlib.compress(payload, 1)
+
+
+def _unpack(blob):
+    scores, other = json.loads(zlib.decompress(blob))
+    changes = {('scores', page): value for page, value in scores.items()}
+    changes.update({(key,): value for key, value in other.items()})
+    return changes
+
+
+class HistoryManager:
+    """历史记录管理器（撤销/重做）
+
+    不保存完整快照，只保存相邻两次快照之间的差异（正向/反向各一份，
+    scores 按页比较，其它键整体比较），并且差异以压缩后的JSON blob
+    形式驻留内存：50条记录的常驻占用从一堆Python容器缩小到几段
+    bytes，撤销/重做时才解压需要的那一条。
+    """
+
+    def __init__(self, max_history=50):
+        self.max_history = max_history
+        # 差异记录队列，超出上限时自动丢弃最旧的记录
+        self._records = collections.deque(maxlen=max_history)
+        # 当前位置（已应用的记录数）及该位置对应的完整状态
+        self._pos = 0
+        self._view = {}
+
+    def _diff(self, old, new):
+        """计算 old -> new 的正向差异和 new -> old 的反向差异"""
+        forward, reverse = {}, {}
+        old_scores = old.get('scores', {})
+        new_scores = new.get('scores', {})
+        for page in set(old_scores) | set(new_scores):
+            if old_scores.get(page) != new_scores.get(page):
+                forward[('scores', page)] = new_scores.get(page)
+                reverse[('scores', page)] = old_scores.get(page)
+        for key in set(old) | set(new):
+            if key == 'scores':
+                continue
+            if old.get(key) != new.get(key):
+                forward[(key,)] = new.get(key)
+                reverse[(key,)] = old.get(key)
+        return forward, reverse
+
+    def _apply(self, state, changes):
+        for path, value in changes.items():
+            if len(path) == 2:
+                scores = state.setdefault('scores', {})
+                if value is None:
+                    scores.pop(path[1], None)
+                else:
+                    scores[path[1]] = value
+            else:
+                if value is None:
+                    state.pop(path[0], None)
+                else:
+                    state[path[0]] = value
+
+    def add_record(self, data):
+        # 先过一遍JSON把元组等统一成列表/字典，保证和解压出来的
+        # 历史状态用同一种表示做相等比较，不会产生虚假差异
+        data = json.loads(json.dumps(data, ensure_ascii=False))
+
+        forward, reverse = self._diff(self._view, data)
+        if not forward and self._records:
+            # 与当前状态完全相同的快照不重复记录
+            return
+
+        # 丢弃重做分支
+        while len(self._records) > self._pos:
+            self._records.pop()
+
+        # 队列已满时 deque 会自动丢弃最旧的记录
+        self._records.append({
+            'date': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'forward': _pack(forward),
+            'reverse': _pack(reverse),
+        })
+        self._pos = len(self._records)
+
+        self._apply(self._view, forward)
+
+    def can_undo(self):
+        return self._pos > 1
+
+    def undo(self):
+        if not self.can_undo():
+            return None
+        self._pos -= 1
+        self._apply(self._view, _unpack(self._records[self._pos]['reverse']))
+        return copy.deepcopy(self._view)
+
+    def can_redo(self):
+        return self._pos < len(self._records)
+
+    def redo(self):
+        if not self.can_redo():
+            return None
+        self._apply(self._view, _unpack(self._records[self._pos]['forward']))
+        self._pos += 1
+        return copy.deepcopy(self._view)
+
+    def get_history(self):
+        """按时间顺序返回各记录对应的完整状态（供历史记录窗口使用）"""
+        history = [None] * len(self._records)
+        # 从当前位置向两侧重放差异还原各位置的状态
+        state = copy.deepcopy(self._view)
+        for i in range(self._pos - 1, -1, -1):
+            history[i] = {'date': self._records[i]['date'], 'data': copy.deepcopy(state)}
+            self._apply(state, _unpack(self._records[i]['reverse']))
+        state = copy.deepcopy(self._view)
+        for i in range(self._pos, len(self._records)):
+            self._apply(state, _unpack(self._records[i]['forward']))
+            history[i] = {'date': self._records[i]['date'], 'data': copy.deepcopy(state)}
+        return history
@@ -0,0 +1,118 @@
+# 流动红旗评比系统 (Flowing Red Flag Evaluation System)
+# Copyright (C) 2025 流动红旗评比系统开发团队
+#
+# 本程序是自由软件，遵循GNU Affero通用公共许可证版本3或任何更新版本。
+# 更多信息请查看项目根目录的 LICENSE 文件和 README.md 文件。
+
+import atexit
+import datetime
+import logging
+import os
+import queue
+import threading
+
+_logger = logging.getLogger(__name__)
+_logger.addHandler(logging.NullHandler())
+
+
+class LogManager:
+    """日志管理器
+
+    log() 只把消息放进队列，由后台守护线程攒批写入长期打开的带缓冲
+    文件句柄，界面线程上的日志调用不再做任何磁盘I/O。程序退出时自动
+    把剩余日志落盘并关闭句柄。
+    """
+
+    def __init__(self, settings_manager):
+        self.settings_manager = settings_manager
+        self._fh = None
+        # 句柄的写入/关闭可能来自界面线程（flush/rotate/close）和后台线程
+        self._fh_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._open_log_file()
+        self._worker = threading.Thread(target=self._drain_loop, daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def _open_log_file(self):
+        try:
+            log_path = self.settings_manager.get_log_file_path()
+            log_dir = os.path.dirname(log_path)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+            self._fh = open(log_path, 'a', encoding='utf-8', buffering=8192)
+        except OSError:
+            _logger.exception("打开日志文件出错")
+            self._fh = None
+
+    def log(self, message):
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._queue.put_nowait(f"[{timestamp}] {message}\n")
+
+    def _drain_loop(self):
+        """后台线程：每约200ms醒一次，把队列里积累的日志一次性写出"""
+        while True:
+            try:
+                line = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            lines = [line]
+            while True:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write_lines(lines)
+
+    def _write_lines(self, lines):
+        with self._fh_lock:
+            if self._fh is None:
+                return
+            try:
+                self._fh.write("".join(lines))
+            except OSError:
+                _logger.exception("写入日志出错")
+
+    def _drain_pending(self):
+        """同步清空队列（随显式保存/关闭调用，不等后台线程醒来）"""
+        lines = []
+        while True:
+            try:
+                lines.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if lines:
+            self._write_lines(lines)
+
+    def flush(self):
+        """把排队和缓冲中的日志立即落盘（随显式保存操作调用）"""
+        self._drain_pending()
+        with self._fh_lock:
+            if self._fh is not None:
+                try:
+                    self._fh.flush()
+                except OSError:
+                    pass
+
+    def rotate(self):
+        """日志路径变化（如根目录被修改）后重新打开日志文件"""
+        self._drain_pending()
+        with self._fh_lock:
+            if self._fh is not None:
+                try:
+                    self._fh.close()
+                except OSError:
+                    pass
+                self._fh = None
+        self._open_log_file()
+
+    def close(self):
+        self._drain_pending()
+        with self._fh_lock:
+            if self._fh is not None:
+                try:
+                    self._fh.close()
+                except OSError:
+                    pass
+                self._fh = None
+                atexit.unregister(self.close)
@@ -0,0 +1,153 @@
+# 流动红旗评比系统 (Flowing Red Flag Evaluation System)
+# Copyright (C) 2025 流动红旗评比系统开发团队
+#
+# 本程序是自由软件，遵循GNU Affero通用公共许可证版本3或任何更新版本。
+# 更多信息请查看项目根目录的 LICENSE 文件和 README.md 文件。
+
+import contextlib
+import json
+import logging
+import os
+
+_logger = logging.getLogger(__name__)
+_logger.addHandler(logging.NullHandler())
+
+
+class Config:
+    """系统固定配置：评比项目及表格列定义"""
+
+    # 每个项目的表格列：班级 + 周一到周五 + 平均分
+    COLUMNS = ("班级", "周一", "周二", "周三", "周四", "周五", "平均分")
+
+    ITEMS = {
+        "早迟到": {"columns": COLUMNS},
+        "早读": {"columns": COLUMNS},
+        "节能开窗": {"columns": COLUMNS},
+        "仪容仪表": {"columns": COLUMNS},
+        "间操": {"columns": COLUMNS},
+        "午休": {"columns": COLUMNS},
+        "上下午各班卫生": {"columns": COLUMNS},
+        "巡视": {"columns": COLUMNS},
+        "及时上交文件": {"columns": COLUMNS},
+        "宿舍": {"columns": COLUMNS},
+    }
+
+    # 需要分上下午分别打分的项目
+    DUAL_PERIOD_ITEMS = ["上下午各班卫生"]
+
+    DEFAULT_CLASSES = [f"高一({i})班" for i in range(1, 11)]
+
+    DEFAULT_MAX_SCORE = 10
+
+
+class SettingsManager:
+    """系统设置管理器，负责 settings.json 的读取和持久化"""
+
+    def __init__(self):
+        self.settings_file = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "settings.json")
+        self.settings = self.load_settings()
+        # 记录上次持久化内容的哈希，内容未变化时跳过写盘
+        self._settings_hash = None
+        # batch() 上下文中暂缓写盘
+        self._batch_depth = 0
+
+    def default_settings(self):
+        return {
+            "language": "zh",
+            "root_directory": os.path.join(os.path.expanduser("~"), "流动红旗评比系统"),
+            "classes": list(Config.DEFAULT_CLASSES),
+            "weighted_addition": {cls: 0 for cls in Config.DEFAULT_CLASSES},
+            "max_scores": {item: Config.DEFAULT_MAX_SCORE for item in Config.ITEMS},
+        }
+
+    def load_settings(self):
+        settings = self.default_settings()
+        try:
+            if os.path.exists(self.settings_file):
+                with open(self.settings_file, 'r', encoding='utf-8') as f:
+                    settings.update(json.loads(f.read()))
+        except (OSError, json.JSONDecodeError):
+            _logger.exception("读取设置文件出错，使用默认设置")
+        return settings
+
+    def save_settings(self):
+        """把设置写入 settings.json
+
+        内容与上次持久化相同则直接跳过；写入采用"临时文件 + 重命名"
+        保证崩溃安全，并用一次 write 调用完成整个文件的写出。
+        """
+        if self._batch_depth > 0:
+            return
+
+        payload = json.dumps(self.settings, ensure_ascii=False, indent=2, sort_keys=True)
+        payload_hash = hash(payload)
+        if payload_hash == self._settings_hash:
+            return
+
+        try:
+            tmp_file = self.settings_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_file, self.settings_file)
+            self._settings_hash = payload_hash
+        except OSError:
+            _logger.exception("保存设置文件出错")
+
+    @contextlib.contextmanager
+    def batch(self):
+        """批量修改设置时使用，退出上下文后只写盘一次"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            self.save_settings()
+
+    def get_language(self):
+        return self.settings.get("language", "zh")
+
+    def set_language(self, language):
+        self.settings["language"] = language
+        self.save_settings()
+
+    def get_root_directory(self):
+        return self.settings.get("root_directory", self.default_settings()["root_directory"])
+
+    def set_root_directory(self, directory):
+        self.settings["root_directory"] = directory
+        self.save_settings()
+
+    def get_data_file_path(self):
+        return os.path.join(self.get_root_directory(), "流动红旗分数数据.json")
+
+    def get_log_file_path(self):
+        return os.path.join(self.get_root_directory(), "流动红旗评比系统.log")
+
+    def get_classes(self):
+        return list(self.settings.get("classes", Config.DEFAULT_CLASSES))
+
+    def set_classes(self, classes):
+        self.settings["classes"] = list(classes)
+        self.save_settings()
+
+    def get_weighted_addition(self):
+        return dict(self.settings.get("weighted_addition", {}))
+
+    def set_weighted_addition(self, weighted_addition):
+        self.settings["weighted_addition"] = dict(weighted_addition)
+        self.save_settings()
+
+    def get_chinese_font(self):
+        return self.settings.get("chinese_font")
+
+    def set_chinese_font(self, font):
+        self.settings["chinese_font"] = font
+        self.save_settings()
+
+    def get_max_score(self, item_name):
+        return self.settings.get("max_scores", {}).get(item_name, Config.DEFAULT_MAX_SCORE)
+
+    def set_max_score(self, item_name, score):
+        self.settings.setdefault("max_scores", {})[item_name] = score
+        self.save_settings()